@@ -0,0 +1,232 @@
+"""
+batch.py — Territory batches: battlecards for a whole account list in one job.
+
+  runner   = BatchRunner(brief_for, check=is_battlecard)   # brief_for(company, emotion) → brief
+  accounts = parse_accounts(open("accounts.csv").read())
+  for record in runner.run(accounts):            # JSON-ready dicts, as they finish
+      out.write(json.dumps(record) + "\\n")
+
+Each account's progress is checkpointed in SQLite (.scout/batch.db) under a job
+id derived from the account list (or given explicitly). Rerunning an unfinished
+job resumes it: finished accounts are replayed from the checkpoint and only the
+rest run again. A brief that fails `check` is an error, and a checkpointed one
+that fails it runs again.
+
+A job that ends with every account done drops its checkpoint, so running the
+same list later generates fresh briefs. So does a checkpoint untouched for
+SCOUT_BATCH_MAX_AGE_HOURS, or run(..., fresh=True) (`--fresh`, `?fresh=1`).
+
+A job is leased in SQLite while it runs, so a second run of it — in this process
+or another worker — raises BatchBusy. Accounts run through a bounded pool;
+upstream rate limits come from resilience.py.
+
+Records, one per line:
+  {"event": "start",   "job": ..., "total": 120, "resumed": 40}
+  {"event": "account", "job": ..., "index": 3, "company": ..., "status": "done"|"error",
+   "brief" | "error": ..., "seconds": 31.2, "resumed": false}
+  {"event": "end",     "job": ..., "done": 118, "errors": 2, "seconds": 1804.5}
+"""
+import csv
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from research_store import normalize_name
+from storage import connect, state_path
+
+BATCH_WORKERS     = int(os.getenv("SCOUT_BATCH_WORKERS", 4))
+BATCH_MAX_WORKERS = int(os.getenv("SCOUT_BATCH_MAX_WORKERS", 8))
+MAX_AGE           = float(os.getenv("SCOUT_BATCH_MAX_AGE_HOURS", 72)) * 3600
+LEASE             = 60
+
+
+class BatchBusy(RuntimeError):
+    def __init__(self, job: str):
+        super().__init__(f"batch {job} is already running")
+        self.job = job
+
+
+def parse_accounts(text: str, fmt: str = None) -> list:
+    """Accounts from a CSV (`company` / `emotion` columns, else columns 1-2) or JSON list.
+
+    JSON may be a list of names or of {"company", "emotion"} objects, optionally
+    under an "accounts" / "companies" key. Blank and duplicate rows are dropped.
+    """
+    text = (text or "").strip()
+    if fmt is None:
+        fmt = "json" if text[:1] in "[{" else "csv"
+    if fmt == "json":
+        data = json.loads(text) if text else []
+        if isinstance(data, dict):
+            data = data.get("accounts") or data.get("companies") or []
+        rows = [{"company": r} if isinstance(r, str) else r for r in data]
+    else:
+        lines = text.splitlines()
+        header = [h.strip().lower() for h in next(csv.reader(lines[:1]), [])]
+        if "company" in header:
+            rows = [{k.strip().lower(): v for k, v in row.items() if k}
+                    for row in csv.DictReader(lines)]
+        else:
+            rows = [{"company": row[0], "emotion": row[1] if len(row) > 1 else ""}
+                    for row in csv.reader(lines) if row]
+
+    accounts, seen = [], set()
+    for row in rows:
+        company = str(row.get("company") or row.get("name") or "").strip()
+        emotion = str(row.get("emotion") or "neutral").strip().lower()
+        key     = (normalize_name(company), emotion)
+        if company and key not in seen:
+            seen.add(key)
+            accounts.append({"company": company, "emotion": emotion})
+    return accounts
+
+
+def job_key(accounts: list) -> str:
+    """Same account list → same job id, so a rerun resumes."""
+    return hashlib.sha1(json.dumps(accounts, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+class BatchRunner:
+    def __init__(self, brief_for, path: str = None, workers: int = BATCH_WORKERS, check=bool):
+        self.brief_for = brief_for
+        self.check     = check          # brief → is it a usable result?
+        self.path      = path or state_path("batch.db")
+        self.workers   = workers
+        self.owner     = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        db = self._db()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS accounts ("
+            " job TEXT, idx INTEGER, company TEXT, emotion TEXT,"
+            " status TEXT DEFAULT 'pending', brief TEXT, error TEXT, seconds REAL,"
+            " PRIMARY KEY (job, idx))"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job TEXT PRIMARY KEY, owner TEXT, lease_until REAL, updated REAL)"
+        )
+
+    def _db(self):
+        return connect(self.path)
+
+    def run(self, accounts: list, job_id: str = None, workers: int = None, fresh: bool = False):
+        """Start (or resume) a job; returns an iterator of records as accounts finish.
+
+        The job runs on its own thread, so it keeps checkpointing to completion
+        even if the caller stops reading. Raises BatchBusy if it is already running.
+        `fresh` discards any checkpoint for the job first.
+        """
+        job     = job_id or job_key(accounts)
+        workers = max(1, min(workers or self.workers, BATCH_MAX_WORKERS))
+        self._claim(job, fresh)
+        records = queue.Queue()
+        threading.Thread(target=self._drive, args=(job, accounts, workers, records),
+                         name=f"scout-batch-{job}", daemon=True).start()
+        return self._drain(records)
+
+    def _claim(self, job: str, fresh: bool):
+        """Lease `job` to this runner, dropping a stale (or unwanted) checkpoint."""
+        db, now = self._db(), time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT owner, lease_until, updated FROM jobs WHERE job = ?", (job,)).fetchone()
+            if row and row[0] and row[1] > now:
+                raise BatchBusy(job)
+            if fresh or (row and row[2] < now - MAX_AGE):
+                db.execute("DELETE FROM accounts WHERE job = ?", (job,))
+            db.execute(
+                "INSERT INTO jobs (job, owner, lease_until, updated) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (job) DO UPDATE SET owner = excluded.owner,"
+                " lease_until = excluded.lease_until, updated = excluded.updated",
+                (job, self.owner, now + LEASE, now)
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _release(self, job: str, complete: bool):
+        """Give up the lease; a job with every account done forgets its checkpoint."""
+        db = self._db()
+        if complete:
+            db.execute("DELETE FROM accounts WHERE job = ?", (job,))
+            db.execute("DELETE FROM jobs WHERE job = ?", (job,))
+        else:
+            db.execute("UPDATE jobs SET owner = NULL, updated = ? WHERE job = ? AND owner = ?",
+                       (time.time(), job, self.owner))
+
+    @staticmethod
+    def _drain(records: queue.Queue):
+        while True:
+            record = records.get()
+            if record is None:
+                return
+            yield record
+
+    def _drive(self, job: str, accounts: list, workers: int, records: queue.Queue):
+        started, complete = time.monotonic(), False
+        try:
+            db = self._db()
+            db.executemany(
+                "INSERT OR IGNORE INTO accounts (job, idx, company, emotion) VALUES (?, ?, ?, ?)",
+                [(job, i, a["company"], a["emotion"]) for i, a in enumerate(accounts)]
+            )
+            rows = db.execute(
+                "SELECT idx, company, emotion, status, brief, seconds FROM accounts"
+                " WHERE job = ? ORDER BY idx", (job,)
+            ).fetchall()
+            finished = [r for r in rows if r[3] == "done" and self.check(r[4])]
+            pending  = [r for r in rows if not (r[3] == "done" and self.check(r[4]))]
+            records.put({"event": "start", "job": job, "total": len(rows), "resumed": len(finished)})
+            for idx, company, emotion, _, brief, seconds in finished:
+                records.put({"event": "account", "job": job, "index": idx, "company": company,
+                             "emotion": emotion, "status": "done", "brief": brief,
+                             "seconds": seconds, "resumed": True})
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scout-batch") as pool:
+                futures = {pool.submit(self._run_account, job, idx, company, emotion)
+                           for idx, company, emotion, *_ in pending}
+                while futures:
+                    # Renew the lease while accounts run, however long each one takes
+                    db.execute("UPDATE jobs SET lease_until = ? WHERE job = ? AND owner = ?",
+                               (time.time() + LEASE, job, self.owner))
+                    completed, futures = wait(futures, timeout=LEASE / 3, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        records.put(future.result())
+
+            done, errors = db.execute(
+                "SELECT SUM(status = 'done'), SUM(status = 'error') FROM accounts WHERE job = ?", (job,)
+            ).fetchone()
+            records.put({"event": "end", "job": job, "done": done or 0, "errors": errors or 0,
+                         "seconds": round(time.monotonic() - started, 1)})
+            complete = not errors
+        except Exception as e:
+            records.put({"event": "end", "job": job, "error": str(e),
+                         "seconds": round(time.monotonic() - started, 1)})
+        finally:
+            try:
+                self._release(job, complete)
+            finally:
+                records.put(None)
+
+    def _run_account(self, job: str, idx: int, company: str, emotion: str) -> dict:
+        started = time.monotonic()
+        record  = {"event": "account", "job": job, "index": idx, "company": company,
+                   "emotion": emotion, "resumed": False}
+        try:
+            brief = self.brief_for(company, emotion)
+            if not self.check(brief):
+                raise RuntimeError(f"no usable brief: {(brief or '')[:80]!r}")
+            record.update(status="done", brief=brief)
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        record["seconds"] = round(time.monotonic() - started, 1)
+        self._db().execute(
+            "UPDATE accounts SET status = ?, brief = ?, error = ?, seconds = ? WHERE job = ? AND idx = ?",
+            (record["status"], record.get("brief"), record.get("error"), record["seconds"], job, idx)
+        )
+        return record
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+bench/agent.py — Offline, reproducible benchmark for the agent loop.
+
+Replays a recorded fixture (bench/fixtures/*.json) in place of every upstream:
+streamed OpenAI completions chunk by chunk, Tavily results, Neo4j writes and
+Senso uploads, each with the fixture's recorded latency. Research comes from
+the real prebaked/ files. No API keys or network needed.
+
+Drives either run_agent directly (--target agent) or the Flask app's /run +
+/stream through its test client (--target http) at a fixed concurrency and
+reports latency percentiles, throughput, peak RSS and peak thread count.
+
+Usage:
+  python bench/agent.py [--target agent|http] [--requests 30] [--concurrency 4]
+                        [--mode agent|pipeline] [--cold] [--time-scale 1.0]
+  python bench/agent.py --compare REV_A REV_B [same options]
+  python bench/agent.py --record FIXTURE "Salesforce"   # needs OPENAI_API_KEY
+
+--compare checks each revision out into a temporary git worktree and runs
+this script (and its fixtures) against that revision's code.
+"""
+import argparse, contextlib, io, json, os, re, resource, shutil, statistics
+import subprocess, sys, tempfile, threading, time, types
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+ROOT  = os.path.dirname(BENCH)
+DEFAULT_FIXTURE = os.path.join(BENCH, "fixtures", "battlecard.json")
+CARD_HEADING    = re.compile(r"^#+ .+ — Scout Battlecard", re.M)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REPLAY FAKES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _fill(value, company: str, brief: str = ""):
+    """Substitute {company} / {brief} into fixture strings, recursively."""
+    if isinstance(value, str):
+        return value.replace("{company}", company).replace("{brief}", brief)
+    if isinstance(value, list):
+        return [_fill(v, company, brief) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill(v, company, brief) for k, v in value.items()}
+    return value
+
+def _resplit(value: str, pieces: int) -> list:
+    size = max(1, -(-len(value) // pieces))
+    return [value[i * size:(i + 1) * size] for i in range(pieces)]
+
+def _materialize(chunks: list, company: str, brief: str) -> list:
+    """Fill placeholders per stream, then cut each stream back into as many fragments.
+
+    Filling chunk by chunk would miss a {company} split across two fragments.
+    """
+    streams = {}   # "content" or tool index → [(chunk position, tool position)]
+    for pos, recorded in enumerate(chunks):
+        if recorded.get("content"):
+            streams.setdefault("content", []).append((pos, None))
+        for i, tc in enumerate(recorded.get("tool_calls") or []):
+            streams.setdefault(tc["index"], []).append((pos, i))
+
+    filled = [dict(c, tool_calls=[dict(tc) for tc in c.get("tool_calls") or []]) for c in chunks]
+    for stream, places in streams.items():
+        field = "content" if stream == "content" else "arguments"
+        def slot(pos, i):
+            return filled[pos] if i is None else filled[pos]["tool_calls"][i]
+        text = "".join(slot(pos, i).get(field) or "" for pos, i in places)
+        text = _fill(text.replace('"{brief}"', json.dumps(brief)), company)
+        for (pos, i), piece in zip(places, _resplit(text, len(places))):
+            slot(pos, i)[field] = piece
+    return filled
+
+def _chunk(recorded: dict):
+    calls = [types.SimpleNamespace(index=tc["index"], id=tc.get("id"),
+                                   function=types.SimpleNamespace(name=tc.get("name"),
+                                                                  arguments=tc.get("arguments")))
+             for tc in recorded["tool_calls"]] or None
+    delta = types.SimpleNamespace(content=recorded.get("content"), tool_calls=calls)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+
+class ReplayCompletions:
+    """Streams the fixture's turns back with the recorded TTFT and chunk pacing.
+
+    The turn is picked by how many assistant messages the conversation
+    already holds; the company is read back out of the user message.
+    """
+
+    def __init__(self, fixture: dict, scale: float):
+        self.fixture, self.scale = fixture, scale
+        self.latency = fixture["latency"]
+
+    def create(self, messages, stream=False, **kwargs):
+        user    = next(m["content"] for m in messages if m["role"] == "user")
+        company = _company_from(user)
+        if not stream:  # incremental news patch — an empty patch keeps the brief as-is
+            time.sleep(self.latency["ttft_ms"] * self.scale / 1000)
+            msg = types.SimpleNamespace(content="")
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)], usage=None)
+        if kwargs.get("tools"):
+            turn   = sum(1 for m in messages if m["role"] == "assistant")
+            turns  = self.fixture["agent_turns"]
+            chunks = turns[min(turn, len(turns) - 1)]
+            if kwargs.get("tool_choice") == "none":
+                chunks = [c for c in chunks if c.get("content")]
+        else:
+            chunks = self.fixture["pipeline_turn"]
+        brief  = "".join(c.get("content") or "" for c in self.fixture["agent_turns"][2])
+        chunks = _materialize(chunks, company, _fill(brief, company))
+        usage  = None
+        if (kwargs.get("stream_options") or {}).get("include_usage"):
+            text  = "".join(c.get("content") or "" for c in chunks)
+            usage = types.SimpleNamespace(total_tokens=(len(json.dumps(messages)) + len(text)) // 4)
+        return self._stream(chunks, usage)
+
+    def _stream(self, chunks, usage=None):
+        time.sleep(self.latency["ttft_ms"] * self.scale / 1000)
+        for recorded in chunks:
+            time.sleep(self.latency["chunk_ms"] * self.scale / 1000)
+            yield _chunk(recorded)
+        if usage:
+            yield types.SimpleNamespace(choices=[], usage=usage)
+
+class ReplayTavily:
+    def __init__(self, fixture: dict, scale: float):
+        self.fixture, self.scale = fixture, scale
+
+    def search(self, query, **kwargs):
+        time.sleep(self.fixture["latency"]["tavily_ms"] * self.scale / 1000)
+        company = query.rsplit(" pricing", 1)[0]
+        return {"results": _fill(self.fixture["news"], company)}
+
+class ReplayNeo4j:
+    """Driver, session and transaction in one: every write sleeps the recorded latency."""
+
+    def __init__(self, fixture: dict, scale: float):
+        self.delay = fixture["latency"]["neo4j_ms"] * scale / 1000
+        self.counters = types.SimpleNamespace(nodes_created=8, relationships_created=7)
+
+    def session(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, fn, *args, **kwargs):
+        return fn(self, *args, **kwargs)
+
+    def run(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return self
+
+    def consume(self):
+        return types.SimpleNamespace(counters=self.counters)
+
+    def data(self):
+        return []
+
+    def close(self):
+        pass
+
+def _company_from(user_message: str) -> str:
+    text = user_message.replace("[URGENT] ", "")
+    if text.startswith("I have a call with ") and " in 20 minutes" in text:
+        return text[len("I have a call with "):text.index(" in 20 minutes")]
+    return text
+
+def install(scout, fixture: dict, scale: float):
+    """Point every upstream at the fixture; copes with older module layouts."""
+    openai = types.SimpleNamespace(chat=types.SimpleNamespace(
+        completions=ReplayCompletions(fixture, scale)))
+    tavily, neo4j = ReplayTavily(fixture, scale), ReplayNeo4j(fixture, scale)
+    if hasattr(scout, "_clients"):
+        scout._clients.update({"openai": openai, "tavily": tavily, "neo4j": neo4j})
+    for attr, fake in (("openai_client", openai), ("tavily", tavily), ("neo4j_driver", neo4j)):
+        if hasattr(scout, attr):
+            setattr(scout, attr, fake)
+
+    senso_delay = fixture["latency"]["senso_ms"] * scale / 1000
+    def senso_upload(briefs):
+        time.sleep(senso_delay)
+        return [f"bench-{i}" for i, _ in enumerate(briefs)]
+    def ingest_to_senso(company, brief):
+        time.sleep(senso_delay)
+        return "✅ Brief stored in Senso (content_id: bench-0)"
+    if hasattr(scout, "_senso_upload"):
+        scout._senso_upload = senso_upload
+    scout.ingest_to_senso = ingest_to_senso
+    scout.speak_brief     = lambda text: None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DRIVERS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def is_card(brief) -> bool:
+    return bool(brief and CARD_HEADING.search(brief))
+
+def _kwargs_for(fn, **candidates) -> dict:
+    """Only pass the keyword arguments this revision's function accepts."""
+    import inspect
+    params = inspect.signature(fn).parameters
+    return {k: v for k, v in candidates.items() if k in params}
+
+def drive_agent(scout, company: str, mode: str) -> dict:
+    first = []
+    def emit_event(event_type, payload):
+        if event_type == "text_chunk" and not first:
+            first.append(time.perf_counter())
+    start    = time.perf_counter()
+    prefetch = scout.start_prefetch(company) if hasattr(scout, "start_prefetch") else None
+    brief = scout.run_agent(
+        f"I have a call with {company} in 20 minutes. Give me everything I need.",
+        emit_event=emit_event,
+        **_kwargs_for(scout.run_agent, speak=False, prefetch=prefetch, company=company, mode=mode)
+    )
+    # The archived brief must be the card itself, not the model's closing turn
+    if hasattr(scout, "brief_archive"):
+        brief = (scout.brief_archive.latest(company) or {}).get("brief")
+    return {"start": start, "first": first[0] if first else None, "ok": is_card(brief)}
+
+def drive_http(client, company: str, mode: str) -> dict:
+    start = time.perf_counter()
+    r = client.post("/run", json={"company": company, "emotion": "neutral"})
+    if r.status_code != 200:
+        return {"start": start, "first": None, "ok": False}
+    stream = client.get(f"/stream/{r.get_json()['session_id']}", buffered=False)
+    first, ok = None, False
+    for raw in stream.response:
+        for line in raw.decode().splitlines():
+            if not line.startswith("data: "):
+                continue
+            data  = json.loads(line[6:])
+            event = data.get("type")
+            if event in ("text_chunk", "brief_done") and first is None:
+                first = time.perf_counter()
+            ok |= event == "brief_done" and is_card(data.get("brief"))
+    stream.close()
+    return {"start": start, "first": first, "ok": ok}
+
+class PeakSampler(threading.Thread):
+    """Samples the live thread count while the benchmark runs."""
+
+    def __init__(self, interval: float = 0.02):
+        super().__init__(daemon=True)
+        self.interval, self.peak, self.stop = interval, 0, threading.Event()
+
+    def run(self):
+        while not self.stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            self.stop.wait(self.interval)
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+def run_bench(args) -> dict:
+    with open(args.fixture) as f:
+        fixture = json.load(f)
+    workdir = tempfile.mkdtemp(prefix="scout-bench-")
+    os.environ.update({
+        "SCOUT_STATE_DIR": os.path.join(workdir, "state"),  # no cache carried between runs
+        "PREBAKED_DIR":    os.path.join(os.getcwd(), "prebaked"),
+        "SCOUT_MODE":      args.mode,
+        "OPENAI_API_KEY":  "bench", "TAVILY_API_KEY": "bench", "SENSO_API_KEY": "bench",
+        "NEO4J_URI":       "bolt://localhost:7687",
+        "NEO4J_USERNAME":  "bench", "NEO4J_PASSWORD": "bench",
+    })
+    os.environ.pop("MODULATE_API_KEY", None)
+    sys.path.insert(0, os.getcwd())
+    os.chdir(workdir)  # briefs land in the scratch dir's output/
+
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet):
+        import scout
+        install(scout, fixture, args.time_scale)
+        if args.target == "http":
+            import flask_app
+            client = flask_app.app.test_client()
+            drive  = lambda company: drive_http(client, company, args.mode)
+        else:
+            drive  = lambda company: drive_agent(scout, company, args.mode)
+
+    companies = args.companies.split(",")
+    def company_for(i: int) -> str:
+        name = companies[i % len(companies)]
+        return f"{name} {i}" if args.cold else name  # unique name → no cache or flight reuse
+
+    results, lock, counter = [], threading.Lock(), iter(range(args.warmup + args.requests))
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            r = drive(company_for(i))
+            r["end"] = time.perf_counter()
+            if i >= args.warmup:
+                with lock:
+                    results.append(r)
+
+    sampler = PeakSampler()
+    sampler.start()
+    began = time.perf_counter()
+    with contextlib.redirect_stdout(quiet):
+        threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - began
+    sampler.stop.set()
+    sampler.join()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    latency = [r["end"] - r["start"] for r in results]
+    ttfc    = [r["first"] - r["start"] for r in results if r["first"]]
+    return {
+        "target":       args.target,
+        "mode":         args.mode,
+        "requests":     len(results),
+        "concurrency":  args.concurrency,
+        "errors":       sum(not r["ok"] for r in results),
+        "p50_s":        percentile(latency, 50),
+        "p95_s":        percentile(latency, 95),
+        "p99_s":        percentile(latency, 99),
+        "mean_s":       statistics.fmean(latency) if latency else 0.0,
+        "first_chunk_p50_s": percentile(ttfc, 50),
+        "throughput_rps":    len(results) / elapsed if elapsed else 0.0,
+        "peak_rss_mb":       resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_threads":      sampler.peak,
+    }
+
+# ─────────────────────────────────────────────────────────────────────────────
+# REPORTING / COMPARE
+# ─────────────────────────────────────────────────────────────────────────────
+
+ROWS = [("p50_s", "p50 latency", "s"), ("p95_s", "p95 latency", "s"), ("p99_s", "p99 latency", "s"),
+        ("first_chunk_p50_s", "first chunk p50", "s"), ("throughput_rps", "throughput", "req/s"),
+        ("peak_rss_mb", "peak RSS", "MB"), ("peak_threads", "peak threads", ""), ("errors", "errors", "")]
+
+def report(result: dict):
+    print(f"[BENCH] target={result['target']} mode={result['mode']} "
+          f"requests={result['requests']} concurrency={result['concurrency']}")
+    for key, label, unit in ROWS:
+        print(f"        {label:<16} {result[key]:>10.3f} {unit}")
+
+def report_compare(rev_a: str, a: dict, rev_b: str, b: dict):
+    print(f"[BENCH] target={a['target']} mode={a['mode']} "
+          f"requests={a['requests']} concurrency={a['concurrency']}")
+    print(f"        {'':<16} {rev_a[:12]:>12} {rev_b[:12]:>12} {'change':>9}")
+    for key, label, unit in ROWS:
+        change = f"{(b[key] - a[key]) / a[key] * 100:+8.1f}%" if a[key] else f"{'—':>9}"
+        print(f"        {label:<16} {a[key]:>12.3f} {b[key]:>12.3f} {change} {unit}")
+
+def run_at(rev: str, argv: list) -> dict:
+    """Run this benchmark against `rev` in a throwaway worktree."""
+    tree = tempfile.mkdtemp(prefix=f"scout-{rev[:8]}-")
+    subprocess.run(["git", "worktree", "add", "--detach", tree, rev],
+                   cwd=ROOT, check=True, capture_output=True)
+    try:
+        shutil.copytree(BENCH, os.path.join(tree, "bench"), dirs_exist_ok=True)
+        out = subprocess.run([sys.executable, os.path.join("bench", "agent.py"), "--json", *argv],
+                             cwd=tree, check=True, capture_output=True, text=True)
+        return json.loads(out.stdout.strip().splitlines()[-1])
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", tree], cwd=ROOT, capture_output=True)
+
+def strip_compare(argv: list) -> list:
+    out, skip = [], 0
+    for arg in argv:
+        if skip:
+            skip -= 1
+        elif arg == "--compare":
+            skip = 2
+        else:
+            out.append(arg)
+    return out
+
+# ─────────────────────────────────────────────────────────────────────────────
+# RECORD
+# ─────────────────────────────────────────────────────────────────────────────
+
+def record(path: str, company: str):
+    """Run one live agent session and save its streamed turns as a fixture.
+
+    Only the model's stream is recorded; news, latencies and the pipeline turn
+    are taken from the default fixture so the file stays replayable.
+    """
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import scout
+    with open(DEFAULT_FIXTURE) as f:
+        fixture = json.load(f)
+    live, turns = scout.get_openai(), []
+
+    def recorded_stream(stream):
+        chunks = []
+        for chunk in stream:
+            delta, entry = chunk.choices[0].delta, {}
+            if delta.content:
+                entry["content"] = delta.content.replace(company, "{company}")
+            if delta.tool_calls:
+                entry["tool_calls"] = [{"index": tc.index, "id": tc.id, "name": tc.function.name,
+                                        "arguments": (tc.function.arguments or "").replace(company, "{company}")}
+                                       for tc in delta.tool_calls]
+            if entry:
+                chunks.append(entry)
+            yield chunk
+        turns.append(chunks)
+
+    class Recorder:
+        def create(self, **kwargs):
+            result = live.chat.completions.create(**kwargs)
+            return recorded_stream(result) if kwargs.get("stream") and kwargs.get("tools") else result
+
+    scout._clients["openai"] = types.SimpleNamespace(chat=types.SimpleNamespace(completions=Recorder()))
+    scout.run_agent(f"I have a call with {company} in 20 minutes. Give me everything I need.",
+                    speak=False, company=company, mode="agent")
+    fixture["agent_turns"] = turns
+    fixture["description"] = f"Recorded agent run for {company}; {{company}} is substituted per request."
+    with open(path, "w") as f:
+        json.dump(fixture, f, indent=1)
+    print(f"[BENCH] Recorded {len(turns)} turns → {path}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ENTRY POINT
+# ─────────────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline agent-loop benchmark")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--target", choices=("agent", "http"), default="agent")
+    parser.add_argument("--mode", choices=("agent", "pipeline"), default="agent")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--companies", default="Salesforce,HubSpot,Notion")
+    parser.add_argument("--cold", action="store_true", help="unique company per request — no cache hits")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="multiply recorded upstream latencies (0 = measure Scout's own overhead)")
+    parser.add_argument("--json", action="store_true", help="print the result as one JSON line")
+    parser.add_argument("--compare", nargs=2, metavar=("REV_A", "REV_B"))
+    parser.add_argument("--record", nargs=2, metavar=("FIXTURE", "COMPANY"))
+    args = parser.parse_args()
+
+    if args.record:
+        record(*args.record)
+    elif args.compare:
+        argv = strip_compare(sys.argv[1:])
+        a, b = (run_at(rev, argv) for rev in args.compare)
+        report_compare(args.compare[0], a, args.compare[1], b)
+    else:
+        os.chdir(ROOT)
+        result = run_bench(args)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            report(result)
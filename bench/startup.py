@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+bench/startup.py — Import-time budget for Scout's entry modules.
+
+Imports each module in a fresh interpreter several times and fails (exit 1)
+if the median exceeds its budget, so a heavyweight import or an eager client
+sneaking back into module scope shows up before it slows every worker boot.
+With --verbose, prints the slowest imports from `python -X importtime`.
+
+Usage: python bench/startup.py [--runs 5] [--verbose]
+"""
+import argparse, os, statistics, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module → median import budget in milliseconds
+BUDGETS = {
+    "scout":     float(os.getenv("SCOUT_IMPORT_BUDGET_MS", 250)),
+    "flask_app": float(os.getenv("FLASK_IMPORT_BUDGET_MS", 500)),
+}
+
+PROBE = "import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+
+def measure(module: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+def slowest_imports(module: str, top: int = 10) -> list:
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]) / 1000, parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check Scout's import-time budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--verbose", action="store_true", help="show the slowest imports")
+    args = parser.parse_args()
+
+    over = False
+    for module, budget in BUDGETS.items():
+        samples = measure(module, args.runs)
+        median  = statistics.median(samples)
+        ok      = median <= budget
+        over   |= not ok
+        print(f"[STARTUP] {'✅' if ok else '❌'} import {module:<10} "
+              f"median {median:6.1f} ms  (min {min(samples):.1f}, budget {budget:.0f})")
+        if args.verbose or not ok:
+            for ms, name in slowest_imports(module):
+                print(f"            {ms:7.1f} ms  {name}")
+    sys.exit(1 if over else 0)
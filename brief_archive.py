@@ -0,0 +1,149 @@
+"""
+brief_archive.py — Indexed archive of every finished brief.
+
+  archive  = BriefArchive()
+  brief_id = archive.add("Salesforce", brief, session_id="a1b2c3", emotion="neutral")
+  archive.latest("salesforce inc")                     # newest card for a company
+  archive.latest("Salesforce", before=time.time() - 7 * 86400)   # last week's card
+  archive.search("price increase", company="HubSpot")  # full text, best match first
+
+Briefs are rows in SQLite (.scout/briefs.db) keyed by company, timestamp and
+session, with an FTS5 index over company + text kept in sync by triggers.
+Company lookups go through normalize_name, so "Salesforce Inc." and
+"salesforce inc" hit the same rows. If this SQLite build has no FTS5, search
+falls back to LIKE.
+
+Retention runs on every add: briefs older than BRIEF_RETENTION_DAYS are
+dropped, and so is anything past the newest BRIEF_KEEP_PER_COMPANY per company.
+"""
+import os
+import time
+
+from research_store import normalize_name
+from storage import connect, state_path
+
+RETENTION_DAYS   = float(os.getenv("BRIEF_RETENTION_DAYS", 180))
+KEEP_PER_COMPANY = int(os.getenv("BRIEF_KEEP_PER_COMPANY", 50))
+
+COLUMNS = "id, company, session_id, emotion, mode, created"
+
+
+def _row(cursor, row) -> dict:
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+class BriefArchive:
+    def __init__(self, path: str = None):
+        self.path = path or state_path("briefs.db")
+        db = self._db()
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS briefs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, company TEXT, company_key TEXT,"
+            " session_id TEXT, emotion TEXT, mode TEXT, created REAL, brief TEXT)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS briefs_company ON briefs (company_key, created)")
+        db.execute("CREATE INDEX IF NOT EXISTS briefs_session ON briefs (session_id)")
+        try:
+            db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS briefs_fts USING fts5("
+                " company, brief, content='briefs', content_rowid='id')"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS briefs_ai AFTER INSERT ON briefs BEGIN"
+                " INSERT INTO briefs_fts (rowid, company, brief) VALUES (new.id, new.company, new.brief);"
+                " END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS briefs_ad AFTER DELETE ON briefs BEGIN"
+                " INSERT INTO briefs_fts (briefs_fts, rowid, company, brief)"
+                " VALUES ('delete', old.id, old.company, old.brief);"
+                " END"
+            )
+            self.fts = True
+        except Exception as e:
+            print(f"[ARCHIVE] FTS5 unavailable ({e}) — search falls back to LIKE")
+            self.fts = False
+
+    def _db(self):
+        return connect(self.path)
+
+    def _query(self, sql: str, params=()) -> list:
+        cursor = self._db().execute(sql, params)
+        return [_row(cursor, row) for row in cursor.fetchall()]
+
+    # ── writes ───────────────────────────────────────────────────────────────
+
+    def add(self, company: str, brief: str, session_id: str = None, emotion: str = "neutral",
+            mode: str = "agent") -> int:
+        """Archive a finished brief; returns its id."""
+        cursor = self._db().execute(
+            "INSERT INTO briefs (company, company_key, session_id, emotion, mode, created, brief)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (company, normalize_name(company), session_id, emotion, mode, time.time(), brief)
+        )
+        self.prune()
+        return cursor.lastrowid
+
+    def prune(self) -> int:
+        """Apply the retention policy; returns how many briefs were dropped."""
+        db = self._db()
+        removed = db.execute(
+            "DELETE FROM briefs WHERE created < ?", (time.time() - RETENTION_DAYS * 86400,)
+        ).rowcount
+        removed += db.execute(
+            "DELETE FROM briefs WHERE id IN ("
+            " SELECT id FROM (SELECT id, ROW_NUMBER() OVER"
+            "  (PARTITION BY company_key ORDER BY created DESC) AS n FROM briefs)"
+            " WHERE n > ?)", (KEEP_PER_COMPANY,)
+        ).rowcount
+        return removed
+
+    # ── reads ────────────────────────────────────────────────────────────────
+
+    def get(self, brief_id: int):
+        rows = self._query(f"SELECT {COLUMNS}, brief FROM briefs WHERE id = ?", (brief_id,))
+        return rows[0] if rows else None
+
+    def latest(self, company: str, before: float = None):
+        """Newest brief for `company` (optionally created before a timestamp), or None."""
+        rows = self._query(
+            f"SELECT {COLUMNS}, brief FROM briefs WHERE company_key = ? AND created < ?"
+            " ORDER BY created DESC LIMIT 1",
+            (normalize_name(company), before or time.time() + 1)
+        )
+        return rows[0] if rows else None
+
+    def history(self, company: str = None, since: float = None, before: float = None,
+                limit: int = 20) -> list:
+        """Brief metadata, newest first, optionally for one company and a time window."""
+        sql    = f"SELECT {COLUMNS} FROM briefs WHERE created >= ? AND created < ?"
+        params = [since or 0, before or time.time() + 1]
+        if company:
+            sql += " AND company_key = ?"
+            params.append(normalize_name(company))
+        return self._query(sql + " ORDER BY created DESC LIMIT ?", (*params, limit))
+
+    def search(self, text: str, company: str = None, since: float = None, before: float = None,
+               limit: int = 20) -> list:
+        """Full-text search, best match first; each hit carries a `snippet`."""
+        terms = text.split()
+        if not terms:
+            return []
+        window = [since or 0, before or time.time() + 1]
+        if self.fts:
+            # Quote every term: user text is never parsed as FTS5 query syntax
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+            sql = (f"SELECT {', '.join('b.' + c.strip() for c in COLUMNS.split(','))},"
+                   " snippet(briefs_fts, 1, '**', '**', '…', 16) AS snippet"
+                   " FROM briefs_fts JOIN briefs b ON b.id = briefs_fts.rowid"
+                   " WHERE briefs_fts MATCH ? AND b.created >= ? AND b.created < ?")
+            params, order = [match, *window], " ORDER BY rank"
+        else:
+            sql = (f"SELECT {COLUMNS}, substr(brief, 1, 160) AS snippet FROM briefs b"
+                   " WHERE created >= ? AND created < ?"
+                   + " AND brief LIKE ?" * len(terms))
+            params, order = [*window, *(f"%{t}%" for t in terms)], " ORDER BY created DESC"
+        if company:
+            sql += " AND b.company_key = ?"
+            params.append(normalize_name(company))
+        return self._query(sql + order + " LIMIT ?", (*params, limit))
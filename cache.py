@@ -0,0 +1,158 @@
+"""
+cache.py — Tiered result cache: in-process LRU in front of a shared SQLite store.
+
+  cache = TieredCache("tavily_news", ttl=3600, stale_ttl=6 * 3600)
+  value = cache.get_or_fetch(key, lambda: expensive_call())
+
+Entries younger than `ttl` are fresh. Entries up to `ttl + stale_ttl` old are
+served immediately while a single background refresh replaces them
+(stale-while-revalidate). Anything older is fetched inline and replaced.
+Failed fetches raise and are never cached; peek() still returns the expired
+value so a caller can degrade to it.
+
+Expired rows stay on disk for `retention` seconds (CACHE_RETENTION_HOURS,
+default a week, never less than ttl + stale_ttl) — the horizon peek() can fall
+back over, in any worker and across restarts. Older rows are swept at most
+every SWEEP_EVERY seconds.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from storage import connect, state_path
+
+CACHE_DB = state_path("cache.db")
+
+RETENTION   = float(os.getenv("CACHE_RETENTION_HOURS", 7 * 24)) * 3600
+SWEEP_EVERY = 600
+
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scout-cache")
+
+
+class TieredCache:
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_items: int = 256,
+                 path: str = None, retention: float = RETENTION):
+        self.name      = name
+        self.ttl       = ttl
+        self.stale_ttl = stale_ttl
+        self.retention = max(retention, ttl + stale_ttl)
+        self._swept    = 0.0
+        self.max_items = max_items
+        self.path      = path or CACHE_DB
+        self._lru      = OrderedDict()   # key → (value, created)
+        self._lock     = threading.Lock()
+        self._refreshing = set()
+        self.counters  = {"hits": 0, "disk_hits": 0, "stale_hits": 0,
+                          "misses": 0, "refreshes": 0, "errors": 0}
+        self._db().execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " ns TEXT, key TEXT, value TEXT, created REAL,"
+            " PRIMARY KEY (ns, key))"
+        )
+
+    # ── storage tiers ────────────────────────────────────────────────────────
+
+    def _db(self):
+        return connect(self.path)
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: str, created: float):
+        with self._lock:
+            self._lru[key] = (value, created)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    def _lookup(self, key: str):
+        """Return (value, created, tier) or None, checking memory then disk."""
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry:
+                self._lru.move_to_end(key)
+                return entry[0], entry[1], "memory"
+        row = self._db().execute(
+            "SELECT value, created FROM cache WHERE ns = ? AND key = ?",
+            (self.name, self._digest(key))
+        ).fetchone()
+        if row:
+            self._remember(key, row[0], row[1])
+            return row[0], row[1], "disk"
+        return None
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    # ── public API ───────────────────────────────────────────────────────────
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._remember(key, value, now)
+        db = self._db()
+        db.execute(
+            "INSERT OR REPLACE INTO cache (ns, key, value, created) VALUES (?, ?, ?, ?)",
+            (self.name, self._digest(key), value, now)
+        )
+        if now - self._swept >= SWEEP_EVERY:
+            self._swept = now
+            db.execute("DELETE FROM cache WHERE ns = ? AND created < ?", (self.name, now - self.retention))
+
+    def get(self, key: str):
+        """Fresh value for `key`, or None. Does not trigger a refresh."""
+        entry = self._lookup(key)
+        if entry and time.time() - entry[1] < self.ttl:
+            self._count("hits" if entry[2] == "memory" else "disk_hits")
+            return entry[0]
+        return None
+
+    def peek(self, key: str):
+        """Whatever value is still stored for `key`, regardless of age, or None."""
+        entry = self._lookup(key)
+        return entry[0] if entry else None
+
+    def get_or_fetch(self, key: str, fetch):
+        entry = self._lookup(key)
+        if entry:
+            value, created, tier = entry
+            age = time.time() - created
+            if age < self.ttl:
+                self._count("hits" if tier == "memory" else "disk_hits")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._refresh_async(key, fetch)
+                return value
+            # expired — the row stays for `retention`, so peek() can still fall back
+        self._count("misses")
+        value = fetch()
+        self.set(key, value)
+        return value
+
+    def _refresh_async(self, key: str, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.set(key, fetch())
+                self._count("refreshes")
+            except Exception as e:
+                self._count("errors")
+                print(f"[CACHE] {self.name} refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        _refresh_pool.submit(refresh)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"name": self.name, "size": len(self._lru), **self.counters}
@@ -0,0 +1,191 @@
+"""
+compact.py — Shrink Yutori research into a token-budgeted context for the model.
+
+Yutori returns HTML (<main>, <h3>, <p><b>, tables) with one empty <a href>
+per citation. compact_research():
+  1. strips markup into plain text blocks (paragraphs, list items, table rows)
+  2. replaces each citation with a [n] marker, deduping repeated URLs
+  3. groups blocks into sections under their heading / bold lead-in
+  4. keeps the title + summary, then the most sales-relevant sections, in
+     document order, until the token budget is spent
+
+Prebaked files get a precomputed sidecar (salesforce.json → salesforce.compact.md)
+so none of this runs on the request path.
+"""
+import os
+import re
+from html.parser import HTMLParser
+
+from storage import atomic_write
+
+TOKEN_BUDGET = int(os.getenv("COMPACT_TOKEN_BUDGET", 2000))
+
+# What a rep walking into a call actually needs, weighted
+RELEVANCE = {
+    "pricing": 3, "price": 3, "tier": 2, "cost": 2, "discount": 2,
+    "weakness": 3, "complaint": 3, "churn": 3, "limitation": 2, "criticism": 2,
+    "competitor": 3, "compete": 2, "versus": 2, "vs": 2, "switch": 2, "migrate": 2,
+    "ceo": 2, "leadership": 2, "executive": 2, "president": 1, "departure": 2,
+    "news": 2, "launch": 2, "announce": 2, "acquisition": 2, "layoff": 2, "2026": 2,
+    "revenue": 1, "funding": 1, "growth": 1, "customer": 1, "support": 1, "ai": 1,
+}
+
+BLOCK_TAGS   = {"p", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "main", "div", "table", "ul", "ol"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """gpt-4o tokens via tiktoken when available (loaded on first use), else ~4 chars/token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:  # tiktoken is optional — the estimate is close enough for budgeting
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+class _Flattener(HTMLParser):
+    """HTML → [(kind, text)] blocks, with citations collapsed to [n]."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks  = []
+        self.sources = []    # unique URLs in first-seen order
+        self._buf    = []
+        self._kind   = "text"
+        self._cells  = None
+
+    def _flush(self):
+        text = " ".join("".join(self._buf).split())
+        if text:
+            self.blocks.append((self._kind, text))
+        self._buf, self._kind = [], "text"
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                if href not in self.sources:
+                    self.sources.append(href)
+                self._buf.append(f" [{self.sources.index(href) + 1}]")
+        elif tag == "tr":
+            self._flush()
+            self._cells = []
+        elif tag in ("td", "th") and self._cells is not None:
+            self._buf = []
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._kind = "heading" if tag in HEADING_TAGS else ("item" if tag == "li" else "text")
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cells is not None:
+            self._cells.append(" ".join("".join(self._buf).split()))
+            self._buf = []
+        elif tag == "tr" and self._cells is not None:
+            self.blocks.append(("row", " | ".join(self._cells)))
+            self._cells = None
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        self._buf.append(data)
+
+
+def _render(kind: str, text: str) -> str:
+    return {"heading": f"### {text}", "item": f"- {text}"}.get(kind, text)
+
+
+def _sections(blocks: list) -> list:
+    """Group blocks into sections: a heading or a '**Lead.**'-style paragraph starts one."""
+    sections, current = [], []
+    for kind, text in blocks:
+        starts_section = kind == "heading" or (kind == "text" and re.match(r"^[A-Z][^.]{2,60}\.", text)
+                                               and current and current[-1][0] != "heading")
+        if starts_section and current:
+            sections.append(current)
+            current = []
+        current.append((kind, text))
+    if current:
+        sections.append(current)
+    return ["\n".join(_render(k, t) for k, t in section) for section in sections]
+
+
+def _score(section: str, query_terms: set) -> float:
+    words = re.findall(r"[a-z0-9]+", section.lower())
+    if not words:
+        return 0.0
+    hits = sum(RELEVANCE.get(w.rstrip("s"), RELEVANCE.get(w, 0)) for w in words)
+    hits += sum(3 for w in words if w in query_terms)
+    return hits / (len(words) ** 0.5)   # favour dense sections without starving long ones
+
+
+def compact_research(text: str, query: str = "", budget: int = TOKEN_BUDGET) -> str:
+    """Plain-text, deduped, token-budgeted version of a research result."""
+    if "<" not in text:
+        return text if count_tokens(text) <= budget else text[:budget * 4]
+    parser = _Flattener()
+    parser.feed(text)
+    parser.close()
+    sections = _sections(parser.blocks)
+    if not sections:
+        return ""
+
+    query_terms = set(re.findall(r"[a-z0-9]+", query.lower()))
+    # Title + executive summary always lead; the rest compete on relevance
+    keep   = set(range(min(2, len(sections))))
+    spent  = sum(count_tokens(sections[i]) for i in keep)
+    ranked = sorted(range(len(sections)), key=lambda i: _score(sections[i], query_terms), reverse=True)
+    for i in ranked:
+        if i in keep:
+            continue
+        cost = count_tokens(sections[i])
+        if spent + cost <= budget:
+            keep.add(i)
+            spent += cost
+
+    def render(indices):
+        body  = "\n\n".join(sections[i] for i in sorted(indices))
+        cited = sorted({int(n) for n in re.findall(r"\[(\d+)\]", body)})
+        refs  = "\n".join(f"[{n}] {parser.sources[n - 1]}" for n in cited)
+        return f"{body}\n\nSources:\n{refs}" if refs else body
+
+    # The source list counts against the budget too — shed the weakest sections
+    compacted = render(keep)
+    for i in reversed(ranked):
+        if count_tokens(compacted) <= budget:
+            break
+        if i in keep and i > 1:
+            keep.discard(i)
+            compacted = render(keep)
+    return compacted
+
+
+# ── prebaked sidecars ────────────────────────────────────────────────────────
+
+def sidecar_path(json_path: str) -> str:
+    return re.sub(r"\.json$", ".compact.md", json_path)
+
+
+def write_sidecar(json_path: str, result_text: str) -> str:
+    """Compact `result_text` and store it next to `json_path`; returns the compact text."""
+    compacted = compact_research(result_text)
+    atomic_write(sidecar_path(json_path), f"<!-- budget={TOKEN_BUDGET} -->\n{compacted}")
+    return compacted
+
+
+def load_sidecar(json_path: str):
+    """Precomputed compact text, if present, newer than the JSON, and built at this budget."""
+    path = sidecar_path(json_path)
+    try:
+        if os.path.getmtime(path) < os.path.getmtime(json_path):
+            return None
+        with open(path) as f:
+            header, _, body = f.read().partition("\n")
+    except OSError:
+        return None
+    return body if header == f"<!-- budget={TOKEN_BUDGET} -->" else None
@@ -0,0 +1,314 @@
+"""
+event_bus.py — Bounded agent runner + per-session event streams for SSE.
+
+  bus = EventBus()
+  session_id = bus.open()
+  bus.submit(session_id, fn)           # False when the run pool is saturated
+  bus.publish(session_id, "text_chunk", {"text": "..."})
+  for event_id, data in bus.subscribe(session_id, last_event_id=0): ...
+
+Every event gets a per-session sequence number (the SSE `id:`), so a
+reconnecting EventSource sends Last-Event-ID and replays only what it
+missed. Any number of subscribers can read one session; each keeps its own
+cursor. Sessions are dropped `ttl` seconds after they close (or go idle),
+whether or not anyone streamed them.
+
+Where events live is pluggable (SCOUT_EVENT_TRANSPORT):
+  memory — per-process ring buffers (default; single worker)
+  sqlite — a shared SQLite file, so /stream on any gunicorn worker sees
+           events published by the worker that handled /run
+A Redis or socket-broker transport only needs the same eight methods.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from storage import connect, state_path
+
+MAX_RUNS    = int(os.getenv("SCOUT_MAX_RUNS", 8))
+MAX_QUEUED  = int(os.getenv("SCOUT_MAX_QUEUED", 16))
+BUFFER_SIZE = int(os.getenv("SCOUT_EVENT_BUFFER", 4000))
+SESSION_TTL = float(os.getenv("SCOUT_SESSION_TTL", 600))
+TRANSPORT   = os.getenv("SCOUT_EVENT_TRANSPORT", "memory")
+HEARTBEAT   = 15
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TRANSPORTS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _Session:
+    def __init__(self, buffer_size: int):
+        self.events  = deque(maxlen=buffer_size)   # (event_id, json)
+        self.next_id = 1
+        self.closed  = False
+        self.touched = time.monotonic()
+        self.cond    = threading.Condition()
+
+
+class MemoryTransport:
+    """Ring buffers in this process. Subscribers block on a condition variable."""
+
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._sessions   = {}
+        self._flights    = {}   # single-flight key → session_id of the run in progress
+        self._lock       = threading.Lock()
+
+    def open(self, session_id: str):
+        with self._lock:
+            self._sessions[session_id] = _Session(self.buffer_size)
+
+    def exists(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def publish(self, session_id: str, data: str):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        with session.cond:
+            session.events.append((session.next_id, data))
+            session.next_id += 1
+            session.touched  = time.monotonic()
+            session.cond.notify_all()
+
+    def close(self, session_id: str):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        with session.cond:
+            session.closed  = True
+            session.touched = time.monotonic()
+            session.cond.notify_all()
+
+    def subscribe(self, session_id: str, last_event_id: int, heartbeat: float):
+        cursor = last_event_id
+        while True:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            with session.cond:
+                pending = [e for e in session.events if e[0] > cursor]
+                if not pending:
+                    if session.closed:
+                        return
+                    session.cond.wait(timeout=heartbeat)
+                    pending = [e for e in session.events if e[0] > cursor]
+                    if not pending and not session.closed:
+                        yield None, None
+                        continue
+            for event_id, data in pending:
+                cursor = event_id
+                yield event_id, data
+
+    def claim(self, key: str, session_id: str) -> str:
+        """Register `session_id` as the run for `key` unless a live run holds it."""
+        with self._lock:
+            owner = self._flights.get(key)
+            session = self._sessions.get(owner) if owner else None
+            if session is not None and not session.closed:
+                return owner
+            self._flights[key] = session_id
+            return session_id
+
+    def release(self, key: str, session_id: str):
+        with self._lock:
+            if self._flights.get(key) == session_id:
+                del self._flights[key]
+
+    def sweep(self, ttl: float) -> int:
+        cutoff = time.monotonic() - ttl
+        with self._lock:
+            expired = [sid for sid, s in self._sessions.items() if s.touched < cutoff]
+            for sid in expired:
+                session = self._sessions.pop(sid)
+                with session.cond:
+                    session.cond.notify_all()
+        return len(expired)
+
+
+class SQLiteTransport:
+    """Events in a SQLite file shared by every worker on the host.
+
+    Subscribers poll for rows past their cursor every `poll` seconds; older
+    rows beyond `buffer_size` per session are trimmed as new ones arrive.
+    """
+
+    def __init__(self, path: str = None, buffer_size: int = BUFFER_SIZE, poll: float = 0.1):
+        self.path        = path or state_path("events.db")
+        self.buffer_size = buffer_size
+        self.poll        = poll
+        db = self._db()
+        db.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                   " id TEXT PRIMARY KEY, closed INTEGER DEFAULT 0, touched REAL)")
+        db.execute("CREATE TABLE IF NOT EXISTS events ("
+                   " session_id TEXT, event_id INTEGER, data TEXT,"
+                   " PRIMARY KEY (session_id, event_id))")
+        db.execute("CREATE TABLE IF NOT EXISTS flights (key TEXT PRIMARY KEY, session_id TEXT)")
+
+    def _db(self):
+        return connect(self.path)
+
+    def open(self, session_id: str):
+        self._db().execute("INSERT INTO sessions (id, touched) VALUES (?, ?)", (session_id, time.time()))
+
+    def exists(self, session_id: str) -> bool:
+        return self._db().execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone() is not None
+
+    def publish(self, session_id: str, data: str):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT COALESCE(MAX(event_id), 0) + 1 FROM events WHERE session_id = ?",
+                             (session_id,)).fetchone()
+            event_id = row[0]
+            db.execute("INSERT INTO events VALUES (?, ?, ?)", (session_id, event_id, data))
+            db.execute("UPDATE sessions SET touched = ? WHERE id = ?", (time.time(), session_id))
+            if event_id % 100 == 0:
+                db.execute("DELETE FROM events WHERE session_id = ? AND event_id <= ?",
+                           (session_id, event_id - self.buffer_size))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def close(self, session_id: str):
+        self._db().execute("UPDATE sessions SET closed = 1, touched = ? WHERE id = ?",
+                           (time.time(), session_id))
+
+    def subscribe(self, session_id: str, last_event_id: int, heartbeat: float):
+        db, cursor, idle_since = self._db(), last_event_id, time.monotonic()
+        while True:
+            state = db.execute("SELECT closed FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if state is None:
+                return
+            rows = db.execute("SELECT event_id, data FROM events WHERE session_id = ? AND event_id > ?"
+                              " ORDER BY event_id", (session_id, cursor)).fetchall()
+            for event_id, data in rows:
+                cursor = event_id
+                yield event_id, data
+            if rows:
+                idle_since = time.monotonic()
+                continue
+            if state[0]:
+                return
+            if time.monotonic() - idle_since >= heartbeat:
+                idle_since = time.monotonic()
+                yield None, None
+            time.sleep(self.poll)
+
+    def claim(self, key: str, session_id: str) -> str:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT f.session_id FROM flights f JOIN sessions s ON s.id = f.session_id"
+                " WHERE f.key = ? AND s.closed = 0", (key,)
+            ).fetchone()
+            if row is None:
+                db.execute("INSERT OR REPLACE INTO flights VALUES (?, ?)", (key, session_id))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return row[0] if row else session_id
+
+    def release(self, key: str, session_id: str):
+        self._db().execute("DELETE FROM flights WHERE key = ? AND session_id = ?", (key, session_id))
+
+    def sweep(self, ttl: float) -> int:
+        db = self._db()
+        cutoff = time.time() - ttl
+        expired = db.execute("DELETE FROM sessions WHERE touched < ?", (cutoff,)).rowcount
+        if expired:
+            db.execute("DELETE FROM events WHERE session_id NOT IN (SELECT id FROM sessions)")
+            db.execute("DELETE FROM flights WHERE session_id NOT IN (SELECT id FROM sessions)")
+        return expired
+
+
+TRANSPORTS = {"memory": MemoryTransport, "sqlite": SQLiteTransport}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BUS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class EventBus:
+    def __init__(self, transport=None, max_runs: int = MAX_RUNS, max_queued: int = MAX_QUEUED,
+                 ttl: float = SESSION_TTL):
+        self.transport = transport or TRANSPORTS[TRANSPORT]()
+        self.ttl       = ttl
+        self._pool     = ThreadPoolExecutor(max_workers=max_runs, thread_name_prefix="scout-run")
+        self._slots    = threading.BoundedSemaphore(max_runs + max_queued)
+        threading.Thread(target=self._janitor, name="scout-janitor", daemon=True).start()
+
+    # ── sessions ─────────────────────────────────────────────────────────────
+
+    def open(self) -> str:
+        session_id = str(uuid.uuid4())
+        self.transport.open(session_id)
+        return session_id
+
+    def exists(self, session_id: str) -> bool:
+        return self.transport.exists(session_id)
+
+    def publish(self, session_id: str, event_type: str, payload: dict):
+        self.transport.publish(session_id, json.dumps({"type": event_type, **payload}))
+
+    def close(self, session_id: str):
+        self.transport.close(session_id)
+
+    def subscribe(self, session_id: str, last_event_id: int = 0, heartbeat: float = HEARTBEAT):
+        """Yield (event_id, json) after `last_event_id`; (None, None) on idle heartbeat.
+
+        Returns once the session is closed and fully drained, or has expired.
+        """
+        return self.transport.subscribe(session_id, last_event_id, heartbeat)
+
+    def join_or_open(self, key: str):
+        """Single-flight: (session_id, True) for a new run, or the live run's id and False."""
+        session_id = self.open()
+        owner = self.transport.claim(key, session_id)
+        if owner != session_id:
+            self.close(session_id)
+            return owner, False
+        return session_id, True
+
+    def finish(self, key: str, session_id: str):
+        """Release the single-flight claim so the next request starts a fresh run."""
+        self.transport.release(key, session_id)
+
+    # ── runs ─────────────────────────────────────────────────────────────────
+
+    def submit(self, session_id: str, fn) -> bool:
+        """Run `fn()` on the bounded pool, closing the session when it returns."""
+        if not self._slots.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                fn()
+            finally:
+                self.close(session_id)
+                self._slots.release()
+
+        self._pool.submit(run)
+        return True
+
+    # ── cleanup ──────────────────────────────────────────────────────────────
+
+    def _janitor(self):
+        while True:
+            time.sleep(max(1.0, self.ttl / 10))
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"[EVENTS] Sweep failed: {e}")
+
+    def sweep(self) -> int:
+        """Drop sessions idle for longer than the TTL."""
+        return self.transport.sweep(self.ttl)
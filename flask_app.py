@@ -10,9 +10,7 @@ Then open: http://localhost:5000
 import json
 import os
 import sys
-import threading
-import uuid
-from queue import Queue, Empty
+from datetime import datetime
 
 from flask import Flask, Response, render_template, request, stream_with_context
 from dotenv import load_dotenv
@@ -21,13 +19,32 @@ load_dotenv()
 
 # Add agent-prep to path so we can import scout
 sys.path.insert(0, os.path.dirname(__file__))
-from scout import run_agent
+from scout import batch_runner, brief_archive, graph_store, is_battlecard, run_agent, start_prefetch
+import metrics
+from batch import BatchBusy, parse_accounts
+from cache import TieredCache
+from event_bus import EventBus
+from research_store import normalize_name
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "scout-hackathon-2026"
 
-# In-memory store: session_id → Queue
-event_queues: dict[str, Queue] = {}
+# Bounded run pool + per-session event ring buffers (replayable via Last-Event-ID)
+bus = EventBus()
+
+# Finished briefs, replayed to anyone asking for the same company shortly after
+recent_briefs = TieredCache("recent_briefs", ttl=float(os.getenv("BRIEF_CACHE_TTL", 300)), max_items=128)
+
+GRAPH_HOPS = int(os.getenv("GRAPH_HOPS", 1))
+
+
+def replay_brief(session_id: str, company: str, brief: str):
+    """Publish a cached brief as a complete, already-closed event stream."""
+    bus.publish(session_id, "status", {"message": f"Serving recent brief for {company}", "cached": True})
+    bus.publish(session_id, "tool_done", {"name": "research_company", "result": "Recent brief", "company": company})
+    bus.publish(session_id, "text_chunk", {"text": brief})
+    bus.publish(session_id, "brief_done", {"brief": brief, "cached": True})
+    bus.close(session_id)
 
 
 # ── ROUTES ────────────────────────────────────────────────────────────────────
@@ -42,42 +59,75 @@ def health():
     return "ok"
 
 
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape target: span/LLM histograms and cache counters (per worker)."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/api/graph")
 def api_graph():
-    from scout import neo4j_driver, NEO4J_DB
-    company = request.args.get("company", "")
+    """vis.js nodes/edges, served from graph_store's cache with an ETag.
+
+    ?company= limits it to that company's subgraph (?hops=, default 1);
+    without it, ?page= walks the whole graph GRAPH_PAGE_SIZE edges at a time.
+    """
+    company = request.args.get("company", "").strip()
+    hops    = request.args.get("hops", GRAPH_HOPS, type=int)
+    page    = request.args.get("page", 0, type=int)
     try:
-        with neo4j_driver.session(database=NEO4J_DB) as session:
-            if company:
-                # Only show the subgraph for the searched company
-                result = session.run("""
-                    MATCH (c:Company {name: $name})-[r]->(m)
-                    RETURN c AS n, r, m
-                    UNION
-                    MATCH (c:Company {name: $name})-[:COMPETES_WITH]->(rival)
-                    RETURN c AS n, null AS r, rival AS m
-                """, name=company)
-                # Simpler: just get everything connected to this company in 1 hop
-                result = session.run("""
-                    MATCH (c:Company {name: $name})-[r]->(m)
-                    RETURN c AS n, r, m
-                """, name=company)
-            else:
-                result = session.run("MATCH (n)-[r]->(m) RETURN n, r, m LIMIT 60")
-            nodes, edges = {}, []
-            for record in result:
-                n, m, r = record["n"], record["m"], record["r"]
-                nid, mid = str(n.element_id), str(m.element_id)
-                if nid not in nodes:
-                    nodes[nid] = {"id": nid, "label": n.get("name") or n.get("title") or "?",
-                                  "group": list(n.labels)[0] if n.labels else "Node"}
-                if mid not in nodes:
-                    nodes[mid] = {"id": mid, "label": m.get("name") or m.get("title") or "?",
-                                  "group": list(m.labels)[0] if m.labels else "Node"}
-                edges.append({"from": nid, "to": mid, "type": r.type})
-        return {"nodes": list(nodes.values()), "edges": edges}
+        payload = graph_store.read(company, hops=hops, page=page)
     except Exception as e:
         return {"error": str(e), "nodes": [], "edges": []}
+    response = Response(payload, mimetype="application/json")
+    response.set_etag(graph_store.etag(payload))
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def _day_arg(name: str):
+    """?name=YYYY-MM-DD as a unix timestamp (start of that day, local time), or None."""
+    value = request.args.get(name)
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+@app.route("/api/briefs")
+def api_briefs():
+    """Archived briefs, newest first (metadata only).
+
+    ?company= one account, ?q= full-text search (best match first, with a
+    snippet), ?since= / ?before= YYYY-MM-DD window, ?limit= (default 20).
+    """
+    try:
+        since, before = _day_arg("since"), _day_arg("before")
+    except ValueError as e:
+        return {"error": f"bad date: {e}"}, 400
+    company = request.args.get("company", "").strip() or None
+    limit   = max(1, min(request.args.get("limit", 20, type=int), 200))
+    query   = request.args.get("q", "").strip()
+    if query:
+        briefs = brief_archive.search(query, company=company, since=since, before=before, limit=limit)
+    else:
+        briefs = brief_archive.history(company, since=since, before=before, limit=limit)
+    return {"briefs": briefs}
+
+
+@app.route("/api/briefs/latest")
+def api_brief_latest():
+    """Newest full brief for ?company= — add ?before=YYYY-MM-DD for "last week's card"."""
+    company = request.args.get("company", "").strip()
+    if not company:
+        return {"error": "company is required"}, 400
+    try:
+        brief = brief_archive.latest(company, before=_day_arg("before"))
+    except ValueError as e:
+        return {"error": f"bad date: {e}"}, 400
+    return brief or ({"error": f"no archived brief for {company}"}, 404)
+
+
+@app.route("/api/briefs/<int:brief_id>")
+def api_brief(brief_id):
+    return brief_archive.get(brief_id) or ({"error": "brief not found"}, 404)
 
 
 @app.route("/run", methods=["POST"])
@@ -89,50 +139,101 @@ def run():
     if not company:
         return {"error": "company is required"}, 400
 
-    session_id = str(uuid.uuid4())
-    q: Queue = Queue()
-    event_queues[session_id] = q
+    # Single-flight: identical requests share one run, then its cached brief
+    flight = f"{normalize_name(company)}|{emotion.lower()}"
+    brief  = recent_briefs.get(flight)
+    if brief:
+        session_id = bus.open()
+        replay_brief(session_id, company, brief)
+        return {"session_id": session_id, "cached": True}
+
+    session_id, is_new = bus.join_or_open(flight)
+    if not is_new:
+        return {"session_id": session_id, "joined": True}
 
     def emit_event(event_type: str, payload: dict):
-        q.put(json.dumps({"type": event_type, **payload}))
+        bus.publish(session_id, event_type, payload)
 
     def run_in_thread():
         try:
-            run_agent(
+            brief = run_agent(
                 f"I have a call with {company} in 20 minutes. Give me everything I need.",
                 emotion=emotion,
                 emit_event=emit_event,
-                speak=False  # browser handles TTS via brief_done event
+                speak=False,  # browser handles TTS via brief_done event
+                prefetch=prefetch,
+                company=company,
+                session_id=session_id
             )
+            # Only the card itself is worth replaying, never an ack-only closing turn
+            if is_battlecard(brief):
+                recent_briefs.set(flight, brief)
         except Exception as e:
             emit_event("error", {"message": str(e)})
         finally:
-            q.put(None)  # sentinel — stream is done
+            bus.finish(flight, session_id)
 
-    threading.Thread(target=run_in_thread, daemon=True).start()
+    # Research + news start now, overlapping the model's first turn
+    # (a rejected run still warms the news cache for the retry)
+    prefetch = start_prefetch(company)
+
+    if not bus.submit(session_id, run_in_thread):
+        bus.finish(flight, session_id)
+        bus.close(session_id)
+        return {"error": "Scout is at capacity — try again shortly"}, 503
     return {"session_id": session_id}
 
 
+@app.route("/batch", methods=["POST"])
+def batch():
+    """Battlecards for a list of accounts, streamed back as JSONL as each finishes.
+
+    The body is a JSON account list or CSV (raw, or as a `file` upload).
+    Posting the same list again resumes it while unfinished; once every account
+    is done a repost starts fresh. ?job= names the job, ?fresh=1 discards its checkpoint.
+    """
+    upload = request.files.get("file")
+    if upload:
+        text, fmt = upload.read().decode("utf-8"), "json" if upload.filename.endswith(".json") else None
+    else:
+        text, fmt = request.get_data(as_text=True), "json" if request.is_json else None
+    try:
+        accounts = parse_accounts(text, fmt)
+    except ValueError as e:
+        return {"error": f"could not parse account list: {e}"}, 400
+    if not accounts:
+        return {"error": "no accounts in request"}, 400
+
+    try:
+        records = batch_runner.run(accounts, job_id=request.args.get("job"),
+                                   workers=request.args.get("workers", type=int),
+                                   fresh=request.args.get("fresh", "") in ("1", "true"))
+    except BatchBusy as e:
+        return {"error": str(e), "job": e.job}, 409
+
+    return Response(
+        stream_with_context(json.dumps(record) + "\n" for record in records),
+        mimetype="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+
 @app.route("/stream/<session_id>")
 def stream(session_id):
-    q = event_queues.get(session_id)
-    if not q:
+    if not bus.exists(session_id):
         return {"error": "session not found"}, 404
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        last_event_id = 0
 
     def generate():
-        try:
-            while True:
-                try:
-                    msg = q.get(timeout=15)
-                except Empty:
-                    yield "data: {\"type\":\"heartbeat\"}\n\n"
-                    continue
-                if msg is None:
-                    yield "data: {\"type\":\"done\"}\n\n"
-                    break
-                yield f"data: {msg}\n\n"
-        finally:
-            event_queues.pop(session_id, None)
+        for event_id, data in bus.subscribe(session_id, last_event_id):
+            if event_id is None:
+                yield "data: {\"type\":\"heartbeat\"}\n\n"
+            else:
+                yield f"id: {event_id}\ndata: {data}\n\n"
+        yield "data: {\"type\":\"done\"}\n\n"
 
     return Response(
         stream_with_context(generate()),
@@ -0,0 +1,115 @@
+"""
+graph_store.py — Cached read side of the Neo4j knowledge graph.
+
+  store   = GraphStore(get_neo4j, database="neo4j")
+  payload = store.read("Salesforce", hops=2)     # JSON string for vis.js
+  store.invalidate("Salesforce", "HubSpot")      # after a write
+
+Projections run in Cypher (labels, display names, element ids) so Python only
+de-duplicates nodes. Results are cached per (company, hops, page) in a
+TieredCache. Each company, plus the global view, has a version number in
+SQLite. A write bumps the versions it touches, and the version is part of the
+cache key, so every worker drops stale subgraphs without a shared bus.
+
+Companies are keyed by their exact node name, the same way COMPANY_QUERY
+matches them: "salesforce" and "Salesforce" are different nodes, so they get
+different cache entries.
+"""
+import hashlib
+import json
+import os
+
+from cache import CACHE_DB, TieredCache
+from metrics import span
+from resilience import throttle
+from storage import connect
+
+GRAPH_MAX_HOPS  = int(os.getenv("GRAPH_MAX_HOPS", 3))
+GRAPH_PAGE_SIZE = int(os.getenv("GRAPH_PAGE_SIZE", 60))
+
+GLOBAL = "*"
+
+PROJECTION = """
+WITH DISTINCT r
+ORDER BY elementId(r)
+SKIP $skip LIMIT $limit
+WITH r, startNode(r) AS a, endNode(r) AS b
+RETURN elementId(a) AS from_id, coalesce(a.name, a.title, '?') AS from_label,
+       coalesce(head(labels(a)), 'Node') AS from_group,
+       elementId(b) AS to_id, coalesce(b.name, b.title, '?') AS to_label,
+       coalesce(head(labels(b)), 'Node') AS to_group,
+       type(r) AS type
+"""
+
+# Variable-length bounds can't be parameters; hops is clamped to an int first
+COMPANY_QUERY = ("MATCH p = (:Company {{name: $name}})-[*1..{hops}]-() "
+                 "UNWIND relationships(p) AS r") + PROJECTION
+GLOBAL_QUERY  = "MATCH ()-[r]->()" + PROJECTION
+
+
+class GraphStore:
+    def __init__(self, driver, database: str, ttl: float = None, path: str = None):
+        self.driver   = driver          # callable returning the Neo4j driver
+        self.database = database
+        self.path     = path or CACHE_DB
+        self.cache    = TieredCache(
+            "graph",
+            ttl=float(os.getenv("GRAPH_CACHE_TTL", 300)) if ttl is None else ttl,
+            max_items=int(os.getenv("GRAPH_CACHE_SIZE", 128)),
+            path=self.path
+        )
+        self._db().execute(
+            "CREATE TABLE IF NOT EXISTS graph_versions (scope TEXT PRIMARY KEY, version INTEGER)"
+        )
+
+    def _db(self):
+        return connect(self.path)
+
+    def version(self, scope: str) -> int:
+        row = self._db().execute(
+            "SELECT version FROM graph_versions WHERE scope = ?", (scope,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def invalidate(self, *companies: str):
+        """Bump the version of each company and of the global view."""
+        scopes = {c for c in companies if c} | {GLOBAL}
+        self._db().executemany(
+            "INSERT INTO graph_versions (scope, version) VALUES (?, 1) "
+            "ON CONFLICT (scope) DO UPDATE SET version = version + 1",
+            [(scope,) for scope in scopes]
+        )
+
+    def read(self, company: str = "", hops: int = 1, page: int = 0) -> str:
+        """vis.js payload for `company`'s subgraph (or a page of the whole graph)."""
+        hops  = max(1, min(int(hops), GRAPH_MAX_HOPS))
+        page  = max(0, int(page))
+        scope = company or GLOBAL
+        key   = f"{scope}|{hops}|{page}|v{self.version(scope)}"
+        return self.cache.get_or_fetch(key, lambda: self._query(company, hops, page))
+
+    @staticmethod
+    def etag(payload: str) -> str:
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+    def _query(self, company: str, hops: int, page: int) -> str:
+        params = {"skip": page * GRAPH_PAGE_SIZE, "limit": GRAPH_PAGE_SIZE + 1}
+        if company:
+            query, params["name"] = COMPANY_QUERY.format(hops=hops), company
+        else:
+            query = GLOBAL_QUERY
+        throttle("neo4j")
+        with span("neo4j", "read_graph"), self.driver().session(database=self.database) as session:
+            rows = session.run(query, **params).data()
+
+        more = len(rows) > GRAPH_PAGE_SIZE
+        nodes, edges = {}, []
+        for row in rows[:GRAPH_PAGE_SIZE]:
+            for end in ("from", "to"):
+                nodes.setdefault(row[f"{end}_id"], {"id": row[f"{end}_id"],
+                                                    "label": row[f"{end}_label"],
+                                                    "group": row[f"{end}_group"]})
+            edges.append({"from": row["from_id"], "to": row["to_id"], "type": row["type"]})
+        return json.dumps({"nodes": list(nodes.values()), "edges": edges,
+                           "page": page, "next_page": page + 1 if more else None},
+                          separators=(",", ":"))
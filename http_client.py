@@ -0,0 +1,92 @@
+"""
+http_client.py — Shared, pooled HTTP sessions for every outbound API call.
+
+One requests.Session per host keeps TCP+TLS connections alive between calls
+(a Yutori task is polled dozens of times; Senso does presign + S3 PUT back
+to back). Idempotent methods retry on connection errors and 429/5xx with
+backoff; POSTs never retry automatically. Timeouts live here, per host, so
+call sites don't each pick their own.
+
+  from http_client import http
+  r = http.get("https://api.yutori.com/v1/research/tasks/123", headers=...)
+"""
+import os
+import threading
+from urllib.parse import urlsplit
+
+from metrics import span
+
+POOL_SIZE       = int(os.getenv("HTTP_POOL_SIZE", 16))
+RETRIES         = int(os.getenv("HTTP_RETRIES", 3))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT    = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+
+# Read timeouts (seconds) by host; anything else (e.g. presigned S3 URLs) gets READ_TIMEOUT
+HOST_TIMEOUTS = {
+    "api.yutori.com":              30,
+    "apiv2.senso.ai":              10,
+    "modulate-developer-apis.com": 30,
+}
+S3_TIMEOUT = 15
+
+
+class HTTPClient:
+    def __init__(self, pool_size: int = POOL_SIZE, retries: int = RETRIES):
+        self.pool_size = pool_size
+        self.retries   = retries
+        self._sessions = {}
+        self._lock     = threading.Lock()
+
+    def session_for(self, url: str) -> "requests.Session":
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._sessions[host] = self._new_session()
+        return session
+
+    def _new_session(self) -> "requests.Session":
+        # requests is imported on first use to keep `import scout` fast
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def timeout_for(url: str):
+        host = urlsplit(url).netloc
+        read = HOST_TIMEOUTS.get(host, S3_TIMEOUT if ".s3." in host or host.startswith("s3.") else READ_TIMEOUT)
+        return (CONNECT_TIMEOUT, read)
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        kwargs.setdefault("timeout", self.timeout_for(url))
+        host = urlsplit(url).netloc
+        # Presigned S3 hosts are per-bucket — collapse them into one series
+        with span("http", "s3" if ".s3." in host or host.startswith("s3.") else host):
+            return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "requests.Response":
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> "requests.Response":
+        return self.request("PUT", url, **kwargs)
+
+
+http = HTTPClient()
@@ -0,0 +1,187 @@
+"""
+metrics.py — Latency spans, Prometheus histograms and per-session timing summaries.
+
+  with span("tool", "search_news"):
+      ...
+
+Every span is observed into the scout_span_seconds histogram (labels: kind,
+name) and, if a session is active in the current context, recorded in that
+session's summary. LLM turns get their own time-to-first-token, tokens/sec and
+total-duration histograms via llm_turn().
+
+Sessions are tracked with a contextvar; work handed to a thread pool must be
+submitted through copy_context().run to stay attributed (see submit()).
+render() produces Prometheus text format for /metrics. Values are per process.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, float("inf"))
+RATE_BUCKETS    = (1, 5, 10, 20, 40, 60, 80, 100, 150, 200, float("inf"))
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name       = name
+        self.help       = help_text
+        self.labelnames = labelnames
+        self.buckets    = buckets
+        self._series    = {}   # label values → [bucket counts, sum, count]
+        self._lock      = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key))
+                for bound, n in zip(self.buckets, counts):
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    sep = "," if labels else ""
+                    lines.append(f'{self.name}_bucket{{{labels}{sep}le="{le}"}} {n}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{self.name}_sum{suffix} {total:.6f}")
+                lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY   = []
+COLLECTORS = []   # fn() → list of Prometheus text lines, for stats kept elsewhere
+
+SPAN_SECONDS    = Histogram("scout_span_seconds", "Duration of instrumented operations", ("kind", "name"))
+LLM_TTFT        = Histogram("scout_llm_ttft_seconds", "LLM time to first streamed token", ("name",))
+LLM_TURN        = Histogram("scout_llm_turn_seconds", "LLM turn total duration", ("name",))
+LLM_RATE        = Histogram("scout_llm_tokens_per_second", "LLM streaming rate (chunks/sec after first token)",
+                            ("name",), buckets=RATE_BUCKETS)
+SESSION_SECONDS = Histogram("scout_session_seconds", "End-to-end run_agent duration", ("mode",))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SESSIONS + SPANS
+# ─────────────────────────────────────────────────────────────────────────────
+
+class SessionTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans   = []   # (kind, name, seconds, extra)
+        self._lock   = threading.Lock()
+
+    def add(self, kind: str, name: str, seconds: float, **extra):
+        with self._lock:
+            self.spans.append((kind, name, seconds, extra))
+
+    def summary(self) -> dict:
+        """Per-phase totals for the brief_done event."""
+        with self._lock:
+            spans = list(self.spans)
+        phases = {}
+        for kind, name, seconds, extra in spans:
+            phase = phases.setdefault(f"{kind}:{name}", {"count": 0, "seconds": 0.0})
+            phase["count"]   += 1
+            phase["seconds"]  = round(phase["seconds"] + seconds, 3)
+            if "ttft" in extra:
+                phase["ttft"] = round(phase.get("ttft", 0.0) + extra["ttft"], 3)
+        return {"total_seconds": round(time.perf_counter() - self.started, 3), "phases": phases}
+
+
+_session = contextvars.ContextVar("scout_session", default=None)
+
+
+@contextmanager
+def session(mode: str = "agent"):
+    """Attribute every span in this context (and copied contexts) to one session."""
+    timings = SessionTimings()
+    token = _session.set(timings)
+    try:
+        yield timings
+    finally:
+        _session.reset(token)
+        SESSION_SECONDS.observe(time.perf_counter() - timings.started, mode=mode)
+
+
+def current_timings():
+    """Timing summary for the active session, or None outside one."""
+    timings = _session.get()
+    return timings.summary() if timings else None
+
+
+def submit(pool, fn, *args):
+    """pool.submit(fn, *args), running in a copy of the caller's context."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+@contextmanager
+def span(kind: str, name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        SPAN_SECONDS.observe(seconds, kind=kind, name=name)
+        timings = _session.get()
+        if timings:
+            timings.add(kind, name, seconds)
+
+
+class _LLMTurn:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first   = None
+        self.tokens  = 0
+
+    def token(self):
+        """Call once per streamed content/tool-call chunk."""
+        if self.first is None:
+            self.first = time.perf_counter()
+        self.tokens += 1
+
+
+@contextmanager
+def llm_turn(name: str = "gpt-4o"):
+    turn = _LLMTurn()
+    try:
+        yield turn
+    finally:
+        end   = time.perf_counter()
+        total = end - turn.started
+        LLM_TURN.observe(total, name=name)
+        extra = {}
+        if turn.first is not None:
+            extra["ttft"] = turn.first - turn.started
+            LLM_TTFT.observe(extra["ttft"], name=name)
+            if end > turn.first and turn.tokens > 1:
+                LLM_RATE.observe((turn.tokens - 1) / (end - turn.first), name=name)
+        SPAN_SECONDS.observe(total, kind="llm", name=name)
+        timings = _session.get()
+        if timings:
+            timings.add("llm", name, total, **extra)
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collect in COLLECTORS:
+        try:
+            lines.extend(collect())
+        except Exception as e:
+            lines.append(f"# collector failed: {e}")
+    return "\n".join(lines) + "\n"
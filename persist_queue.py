@@ -0,0 +1,188 @@
+"""
+persist_queue.py — Durable fire-and-forget queue for Neo4j / Senso persistence.
+
+Writes that don't change what the rep sees (graph updates, Senso uploads) are
+enqueued into SQLite under .scout/ and acknowledged immediately. A small
+worker pool drains the queue:
+
+  - jobs of the same kind are claimed in batches (Senso takes several briefs
+    per ingestion call; graph writes go one transaction per job)
+  - a failed job is retried with exponential backoff, then parked as 'dead'
+  - a job refused with one of the `defer` exceptions (an open breaker) waits
+    PERSIST_DEFER seconds without using up an attempt, however long the outage
+  - a lease on claimed jobs means a crashed worker's jobs are picked up again
+  - finished jobs are deleted after PERSIST_KEEP_DONE_HOURS, dead ones after
+    PERSIST_KEEP_DEAD_DAYS
+
+  queue = PersistQueue({"senso": handle_senso_batch, "graph": handle_graph_batch},
+                       defer=(Unavailable,))
+  job_id = queue.enqueue("senso", {"company": ..., "brief": ...})
+
+A handler takes a list of payloads and returns one error (a string or an
+exception, or None on success) per payload; raising fails the whole batch.
+"""
+import json
+import os
+import threading
+import time
+
+from storage import connect, state_path
+
+WORKERS      = int(os.getenv("PERSIST_WORKERS", 2))
+BATCH_SIZE   = int(os.getenv("PERSIST_BATCH_SIZE", 5))
+MAX_ATTEMPTS = int(os.getenv("PERSIST_MAX_ATTEMPTS", 6))
+BACKOFF      = float(os.getenv("PERSIST_BACKOFF", 2))
+BACKOFF_MAX  = float(os.getenv("PERSIST_BACKOFF_MAX", 300))
+LEASE        = float(os.getenv("PERSIST_LEASE", 120))
+DEFER        = float(os.getenv("PERSIST_DEFER", 30))
+KEEP_DONE    = float(os.getenv("PERSIST_KEEP_DONE_HOURS", 24)) * 3600
+KEEP_DEAD    = float(os.getenv("PERSIST_KEEP_DEAD_DAYS", 30)) * 86400
+PRUNE_EVERY  = 600
+
+
+class PersistQueue:
+    def __init__(self, handlers: dict, path: str = None, workers: int = WORKERS,
+                 batch_size: int = BATCH_SIZE, defer: tuple = ()):
+        self.handlers   = handlers
+        self.path       = path or state_path("persist.db")
+        self.workers    = workers
+        self.batch_size = batch_size
+        self.defer      = defer      # exception types that postpone a job instead of failing it
+        self._pruned    = 0.0
+        self._wake      = threading.Condition()
+        self._threads   = []
+        self._db().execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, payload TEXT,"
+            " status TEXT DEFAULT 'pending', attempts INTEGER DEFAULT 0,"
+            " next_run REAL, lease_until REAL, last_error TEXT, created REAL)"
+        )
+        self._db().execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, kind, next_run)")
+
+    def _db(self):
+        return connect(self.path)
+
+    def enqueue(self, kind: str, payload: dict) -> int:
+        now = time.time()
+        cur = self._db().execute(
+            "INSERT INTO jobs (kind, payload, next_run, created) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(payload), now, now)
+        )
+        self.start()
+        with self._wake:
+            self._wake.notify()
+        return cur.lastrowid
+
+    def start(self):
+        """Start the worker pool if it isn't running (also drains jobs left from a restart)."""
+        with self._wake:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._run, name=f"persist-{len(self._threads)}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stats(self) -> dict:
+        rows = self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def drain(self, timeout: float) -> int:
+        """Wait up to `timeout` seconds for pending and running jobs to settle.
+
+        For short-lived processes (the CLI), whose daemon workers die at exit.
+        Returns how many jobs were still outstanding; they stay queued on disk.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            stats = self.stats()
+            left  = stats.get("pending", 0) + stats.get("running", 0)
+            if not left or time.monotonic() >= deadline:
+                return left
+            self.start()
+            time.sleep(0.2)
+
+    def prune(self) -> int:
+        """Delete done and dead jobs past their retention; returns how many went."""
+        now = time.time()
+        return self._db().execute(
+            "DELETE FROM jobs WHERE (status = 'done' AND created < ?) OR (status = 'dead' AND created < ?)",
+            (now - KEEP_DONE, now - KEEP_DEAD)
+        ).rowcount
+
+    # ── workers ──────────────────────────────────────────────────────────────
+
+    def _claim(self):
+        """Lease up to batch_size due jobs of one kind. Returns (kind, [(id, payload, attempts)])."""
+        db, now = self._db(), time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT kind FROM jobs WHERE next_run <= ? AND (status = 'pending'"
+                " OR (status = 'running' AND lease_until < ?)) ORDER BY next_run LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None, []
+            jobs = db.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE kind = ? AND next_run <= ?"
+                " AND (status = 'pending' OR (status = 'running' AND lease_until < ?))"
+                " ORDER BY next_run LIMIT ?",
+                (row[0], now, now, self.batch_size)
+            ).fetchall()
+            db.executemany(
+                "UPDATE jobs SET status = 'running', lease_until = ? WHERE id = ?",
+                [(now + LEASE, job[0]) for job in jobs]
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return row[0], [(job_id, json.loads(payload), attempts) for job_id, payload, attempts in jobs]
+
+    def _run(self):
+        while True:
+            kind, jobs = self._claim()
+            if not jobs:
+                self._maybe_prune()
+                with self._wake:
+                    self._wake.wait(timeout=1.0)
+                continue
+            try:
+                errors = self.handlers[kind]([payload for _, payload, _ in jobs])
+            except Exception as e:
+                errors = [e] * len(jobs)
+            for (job_id, _, attempts), error in zip(jobs, errors):
+                self._settle(job_id, kind, attempts, error)
+
+    def _maybe_prune(self):
+        """Idle workers apply retention, at most once per PRUNE_EVERY across the pool."""
+        with self._wake:
+            if time.time() - self._pruned < PRUNE_EVERY:
+                return
+            self._pruned = time.time()
+        removed = self.prune()
+        if removed:
+            print(f"[PERSIST] Pruned {removed} finished jobs")
+
+    def _settle(self, job_id: int, kind: str, attempts: int, error):
+        db = self._db()
+        if error is None:
+            db.execute("UPDATE jobs SET status = 'done', last_error = NULL WHERE id = ?", (job_id,))
+            return
+        if isinstance(error, self.defer):
+            # The upstream refused without being called — wait it out, attempts untouched
+            db.execute("UPDATE jobs SET status = 'pending', next_run = ?, last_error = ? WHERE id = ?",
+                       (time.time() + DEFER, str(error), job_id))
+            return
+        error = str(error)
+        attempts += 1
+        if attempts >= MAX_ATTEMPTS:
+            print(f"[PERSIST] ❌ {kind} job {job_id} gave up after {attempts} attempts: {error}")
+            db.execute("UPDATE jobs SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                       (attempts, error, job_id))
+            return
+        delay = min(BACKOFF * 2 ** (attempts - 1), BACKOFF_MAX)
+        print(f"[PERSIST] {kind} job {job_id} failed ({error}) — retry in {delay:g}s")
+        db.execute("UPDATE jobs SET status = 'pending', attempts = ?, next_run = ?, last_error = ?"
+                   " WHERE id = ?", (attempts, time.time() + delay, error, job_id))
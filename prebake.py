@@ -1,79 +1,131 @@
 #!/usr/bin/env python3
 """
 prebake.py — Run Yutori Research on demo companies BEFORE the demo.
-Yutori takes 5-10 min per company. Run this NOW and let it cook.
+Yutori takes 5-10 min per company, so every stale company is submitted up
+front (at most --concurrency in flight) and one scheduler polls them all.
+Results are written atomically, each with a precomputed compact sidecar
+for the model; fresh files are left alone.
 
-Usage: python prebake.py
+Usage: python prebake.py [--concurrency 20] [--stale-hours 20] [--accounts accounts.txt] [--force]
 """
-import os, json, time, requests
+import argparse, json, os, threading, time
+from collections import deque
 from dotenv import load_dotenv
 load_dotenv()
 
-os.makedirs("prebaked", exist_ok=True)
+from compact import write_sidecar
+from research_store import ResearchStore, extract_result
+from storage import atomic_write
+from yutori_tasks import YutoriTaskManager
 
-HEADERS = {
-    "X-API-KEY": os.getenv("YUTORI_API_KEY"),
-    "Content-Type": "application/json"
-}
+os.makedirs("prebaked", exist_ok=True)
 
 COMPANIES = [
-    # Salesforce already prebaked — prebaked/salesforce.json exists, skipped here
+    # Salesforce already prebaked — prebaked/salesforce.json exists, refreshed when stale
     ("HubSpot",     "Deep competitive intelligence on HubSpot: pricing tiers, recent product changes, executive team, key weaknesses vs Salesforce, customer complaints, recent news"),
     ("Notion",      "Deep competitive intelligence on Notion: pricing, recent feature launches, executive team, key weaknesses vs Confluence and Linear, customer complaints, recent news"),
 ]
 
-def research_and_save(company: str, query: str):
-    filename = f"prebaked/{company.lower().replace(' ', '_')}.json"
-    if os.path.exists(filename):
-        print(f"[PREBAKE] ✅ {company} already exists, skipping")
-        return
-
-    print(f"\n[PREBAKE] 🔍 Starting Yutori Research for {company}...")
-    try:
-        r = requests.post(
-            "https://api.yutori.com/v1/research/tasks",
-            headers=HEADERS,
-            json={"query": query},
-            timeout=30
-        )
-        r.raise_for_status()
-        task_id = r.json()["task_id"]
-        print(f"[PREBAKE]    Task ID: {task_id}")
-    except Exception as e:
-        print(f"[PREBAKE] ❌ Failed to start task for {company}: {e}")
-        return
-
-    for i in range(120):  # poll up to 20 min
-        time.sleep(10)
+DEFAULT_QUERY = ("Deep competitive intelligence on {company}: pricing, recent product changes, "
+                 "executive team, key weaknesses vs competitors, customer complaints, recent news")
+
+store = ResearchStore("prebaked")
+
+def load_accounts(path: str) -> list:
+    """One company per line; blank lines and #comments are skipped."""
+    with open(path) as f:
+        names = [line.split("#")[0].strip() for line in f]
+    return [(name, DEFAULT_QUERY.format(company=name)) for name in names if name]
+
+def is_stale(company: str, max_age: float) -> bool:
+    path = store.path_for(company)
+    return not os.path.exists(path) or time.time() - os.path.getmtime(path) > max_age
+
+def prebake(companies: list, concurrency: int, max_age: float, force: bool = False) -> dict:
+    """Refresh every stale company with at most `concurrency` Yutori tasks in flight."""
+    todo = deque()
+    for company, query in companies:
+        if force or is_stale(company, max_age):
+            todo.append((company, query))
+        else:
+            print(f"[PREBAKE] ✅ {company} is fresh, skipping")
+    if not todo:
+        return {}
+
+    manager  = YutoriTaskManager()
+    lock     = threading.Lock()
+    finished = threading.Event()
+    outcome  = {}
+    state    = {"in_flight": 0, "left": len(todo)}
+
+    def save(company: str, task: dict):
+        status = task["status"]
         try:
-            r = requests.get(
-                f"https://api.yutori.com/v1/research/tasks/{task_id}",
-                headers=HEADERS,
-                timeout=15
-            )
-            data = r.json()
-            status = data.get("status", "unknown")
-            print(f"[PREBAKE]    {company} [{(i+1)*10}s] → {status}", flush=True)
-            if status in ("completed", "succeeded"):
-                with open(filename, "w") as f:
-                    json.dump(data, f, indent=2)
-                print(f"[PREBAKE] ✅ {company} saved → keys: {list(data.keys())}", flush=True)
-                return
-            elif status in ("failed", "error"):
-                print(f"[PREBAKE] ❌ {company} failed: {data}", flush=True)
-                return
+            if status == "completed":
+                path = store.path_for(company)
+                atomic_write(path, json.dumps({**task["result"], "company": company}, indent=2))
+                write_sidecar(path, extract_result(task["result"]))
+                print(f"[PREBAKE] ✅ {company} saved → {path}", flush=True)
+            else:
+                print(f"[PREBAKE] ❌ {company} {status}", flush=True)
         except Exception as e:
-            print(f"[PREBAKE]    Poll error: {e}", flush=True)
+            status = "save_failed"
+            print(f"[PREBAKE] ❌ Failed to save {company}: {e}", flush=True)
+        finally:
+            # Always free the slot, or the queue stalls and `finished` never fires
+            with lock:
+                state["in_flight"] -= 1
+                state["left"]      -= 1
+                outcome[company]    = status
+            launch()
+
+    def launch():
+        while True:
+            with lock:
+                if not todo or state["in_flight"] >= concurrency:
+                    if state["left"] == 0:
+                        finished.set()
+                    return
+                company, query = todo.popleft()
+                state["in_flight"] += 1
+            try:
+                # Re-attach to a task a previous (dead) run started, else submit a new one
+                task_id = manager.adopt(company) or manager.submit(query, company=company)
+                manager.on_complete(task_id, lambda task, c=company: save(c, task))
+                print(f"[PREBAKE] 🔍 {company} → task {task_id}", flush=True)
+            except Exception as e:
+                print(f"[PREBAKE] ❌ Failed to start task for {company}: {e}", flush=True)
+                with lock:
+                    state["in_flight"] -= 1
+                    state["left"]      -= 1
+                    outcome[company]    = "submit_failed"
 
-    print(f"[PREBAKE] ⏰ Timed out for {company}", flush=True)
+    launch()
+    manager.start()
+    while not finished.wait(timeout=60):
+        with lock:
+            print(f"[PREBAKE]    {state['left']} remaining, {state['in_flight']} in flight", flush=True)
+    return outcome
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prebake Yutori Research for target accounts")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("PREBAKE_CONCURRENCY", 20)),
+                        help="max Yutori tasks in flight")
+    parser.add_argument("--stale-hours", type=float, default=float(os.getenv("PREBAKE_STALE_HOURS", 20)),
+                        help="refresh files older than this")
+    parser.add_argument("--accounts", help="file with one company per line (adds to COMPANIES)")
+    parser.add_argument("--force", action="store_true", help="refresh even fresh files")
+    args = parser.parse_args()
+
+    companies = list(COMPANIES)
+    if args.accounts:
+        companies += load_accounts(args.accounts)
+
     print("=" * 60)
-    print("PREBAKE — Yutori Research (5-10 min per company)")
-    print("Let this run in the background while you build scout.py")
+    print(f"PREBAKE — Yutori Research for {len(companies)} companies "
+          f"(≤{args.concurrency} in flight)")
     print("=" * 60)
 
-    for company, query in COMPANIES:
-        research_and_save(company, query)
-
-    print("\n[PREBAKE] Done! Check prebaked/ folder for results.")
+    outcome = prebake(companies, args.concurrency, args.stale_hours * 3600, force=args.force)
+    ok = sum(1 for s in outcome.values() if s == "completed")
+    print(f"\n[PREBAKE] Done! {ok}/{len(outcome)} refreshed. Check prebaked/ folder for results.")
@@ -0,0 +1,157 @@
+"""
+research_store.py — Memory-resident index over prebaked Yutori research.
+
+Built once at startup from prebaked/*.json. Each file is parsed a single time
+and its result text kept in memory under every alias it answers to: the file
+stem, plus any "company" / "aliases" keys in the JSON. A rescan only stats the
+directory and reloads files whose mtime changed.
+
+The text held (and fed to the model) is the compacted form from compact.py,
+read from the precomputed .compact.md sidecar when it is current.
+
+Lookups try an exact normalized match first, then a character-trigram
+similarity index, so "Salesforce Inc" and "salesforce.com" still find
+salesforce.json without a glob.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from compact import compact_research, load_sidecar, write_sidecar
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.lower().replace(".", "").replace("_", " ").split())
+
+
+def _trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def extract_result(data) -> str:
+    """Pull the result text out of Yutori's response structure."""
+    result = data.get("result", data) if isinstance(data, dict) else data
+    return json.dumps(result) if isinstance(result, dict) else str(result)
+
+
+class ResearchStore:
+    def __init__(self, directory: str = "prebaked", rescan_interval: float = 5.0,
+                 match_threshold: float = 0.5):
+        self.directory       = directory
+        self.rescan_interval = rescan_interval
+        self.match_threshold = match_threshold
+        self._files   = {}               # path → (mtime, aliases, text)
+        self._aliases = {}               # normalized alias → path
+        self._grams   = defaultdict(set) # trigram → aliases containing it
+        self._lock    = threading.Lock()
+        self._scanned = 0.0
+        self.refresh(force=True)
+
+    # ── indexing ─────────────────────────────────────────────────────────────
+
+    def _load(self, path: str, mtime: float):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[RESEARCH] Skipping {path}: {e}")
+            return None
+        stem    = os.path.splitext(os.path.basename(path))[0]
+        aliases = {normalize_name(stem)}
+        if isinstance(data, dict):
+            if data.get("company"):
+                aliases.add(normalize_name(data["company"]))
+            aliases.update(normalize_name(a) for a in data.get("aliases", []) if a)
+        return mtime, aliases, self._compacted(path, extract_result(data))
+
+    @staticmethod
+    def _compacted(path: str, text: str) -> str:
+        """Token-budgeted form from the sidecar, building it if missing or stale."""
+        cached = load_sidecar(path)
+        if cached is not None:
+            return cached
+        try:
+            return write_sidecar(path, text)
+        except OSError:
+            return compact_research(text)   # read-only checkout — compact in memory
+
+    def _rebuild_index(self):
+        aliases, grams = {}, defaultdict(set)
+        for path, (_, names, _) in self._files.items():
+            for alias in names:
+                aliases[alias] = path
+                for gram in _trigrams(alias):
+                    grams[gram].add(alias)
+        # Swap whole structures so concurrent readers see a consistent index
+        self._aliases, self._grams = aliases, grams
+
+    def refresh(self, force: bool = False):
+        """Stat the directory and reload only new or modified files."""
+        if not force and time.monotonic() - self._scanned < self.rescan_interval:
+            return
+        with self._lock:
+            self._scanned = time.monotonic()
+            seen, changed = set(), False
+            try:
+                entries = list(os.scandir(self.directory))
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                seen.add(entry.path)
+                mtime = entry.stat().st_mtime
+                cached = self._files.get(entry.path)
+                if cached and cached[0] == mtime:
+                    continue
+                loaded = self._load(entry.path, mtime)
+                if loaded:
+                    self._files[entry.path] = loaded
+                    changed = True
+            for path in set(self._files) - seen:
+                del self._files[path]
+                changed = True
+            if changed:
+                self._rebuild_index()
+
+    # ── lookup ───────────────────────────────────────────────────────────────
+
+    def _similar(self, query: str):
+        """Best alias by trigram Jaccard over the whole name or any single word."""
+        best, best_score = None, 0.0
+        candidates = [(query, 1.0)] + [(word, 0.9) for word in query.split() if len(word) > 2]
+        for text, weight in candidates:
+            q_grams = _trigrams(text)
+            overlap = defaultdict(int)
+            for gram in q_grams:
+                for alias in self._grams.get(gram, ()):
+                    overlap[alias] += 1
+            for alias, shared in overlap.items():
+                union = len(q_grams) + len(_trigrams(alias)) - shared
+                score = weight * shared / union
+                if score > best_score:
+                    best, best_score = alias, score
+        return best if best_score >= self.match_threshold else None
+
+    def match(self, company: str):
+        """Path of the prebaked file for `company`, or None."""
+        self.refresh()
+        key = normalize_name(company)
+        if key in self._aliases:
+            return self._aliases[key]
+        alias = self._similar(key)
+        return self._aliases.get(alias) if alias else None
+
+    def lookup(self, company: str):
+        """Result text for `company`, or None if nothing close enough is prebaked."""
+        path  = self.match(company)
+        entry = self._files.get(path) if path else None
+        return entry[2] if entry else None
+
+    def path_for(self, company: str) -> str:
+        """Where research for `company` is (or would be) stored."""
+        slug = company.lower().replace(" ", "_").replace(".", "")
+        return os.path.join(self.directory, f"{slug}.json")
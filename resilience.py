@@ -0,0 +1,249 @@
+"""
+resilience.py — Process-wide guards around Scout's upstream APIs.
+
+  throttle("openai")                       # rate limit only
+  guard("tavily", fetch, query)            # rate limit + concurrency cap + breaker
+
+Each upstream gets three guards, all configured from the environment:
+
+  - a token bucket: SCOUT_RATE_<UPSTREAM> requests/s (0 = unlimited, the
+    default) with a burst of SCOUT_BURST_<UPSTREAM>. It is adaptive: a 429 halves
+    the rate and each success wins a little back, up to the configured rate.
+  - a concurrency cap: at most SCOUT_INFLIGHT_<UPSTREAM> calls at once; a
+    caller waits up to SCOUT_INFLIGHT_WAIT seconds for a slot.
+  - a circuit breaker: SCOUT_BREAKER_FAILURES consecutive failures (errors,
+    or calls slower than SCOUT_BREAKER_SLOW_<UPSTREAM> seconds) open it for
+    SCOUT_BREAKER_RESET seconds; then one probe call decides whether it closes.
+
+guard() raises Unavailable instead of calling a capped or broken upstream, so
+callers fail fast with a cached or degraded result. Every worker, batch job
+and interactive session in the process shares the same guards. Breaker
+transitions and short-circuits are reported as "breaker" events to the
+session that saw them (see `events()`).
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+from metrics import span
+
+UPSTREAMS = ("openai", "tavily", "neo4j", "senso", "yutori")
+
+INFLIGHT_DEFAULTS = {"openai": 0, "tavily": 8, "neo4j": 8, "senso": 4, "yutori": 4}
+SLOW_DEFAULTS     = {"openai": 0, "tavily": 8, "neo4j": 10, "senso": 15, "yutori": 15}
+
+INFLIGHT_WAIT    = float(os.getenv("SCOUT_INFLIGHT_WAIT", 5))
+BREAKER_FAILURES = int(os.getenv("SCOUT_BREAKER_FAILURES", 5))
+BREAKER_RESET    = float(os.getenv("SCOUT_BREAKER_RESET", 30))
+
+
+def _env(prefix: str, upstream: str, default: float) -> float:
+    return float(os.getenv(f"{prefix}_{upstream.upper()}", default))
+
+
+class Unavailable(RuntimeError):
+    """guard() refused the call: the upstream's breaker is open or it is at capacity."""
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(f"{upstream} unavailable ({reason})")
+        self.upstream = upstream
+        self.reason   = reason
+
+
+# ── session events ───────────────────────────────────────────────────────────
+
+_emit = contextvars.ContextVar("scout_resilience_events", default=None)
+
+
+@contextmanager
+def events(emit_event):
+    """Report breaker state to `emit_event` for calls made in this context."""
+    token = _emit.set(emit_event)
+    try:
+        yield
+    finally:
+        _emit.reset(token)
+
+
+def _announce(upstream: str, state: str, reason: str = ""):
+    emit_event = _emit.get()
+    if emit_event:
+        emit_event("breaker", {"upstream": upstream, "state": state, "reason": reason})
+
+
+# ── rate limit ───────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = None):
+        self.ceiling = rate             # configured rate; `rate` adapts beneath it
+        self.rate    = rate
+        self.burst   = max(1.0, burst if burst else rate)
+        self.tokens  = self.burst
+        self.stamp   = time.monotonic()
+        self._lock   = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token; returns how long to sleep before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp  = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self):
+        """Upstream said 429: halve the rate (never below 1/16 of the ceiling)."""
+        if self.ceiling > 0:
+            with self._lock:
+                self.rate = max(self.ceiling / 16, self.rate / 2)
+
+    def succeeded(self):
+        if self.ceiling > 0 and self.rate < self.ceiling:
+            with self._lock:
+                self.rate = min(self.ceiling, self.rate + self.ceiling / 20)
+
+
+# ── circuit breaker ──────────────────────────────────────────────────────────
+
+class Breaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, reset: float = BREAKER_RESET):
+        self.name      = name
+        self.threshold = failures
+        self.reset     = reset
+        self.state     = self.CLOSED
+        self.failures  = 0
+        self.opened_at = 0.0
+        self.probing   = False
+        self.rejected  = 0
+        self._lock     = threading.Lock()
+
+    def _set(self, state: str, reason: str = ""):
+        if state != self.state:
+            self.state = state
+            print(f"[RESILIENCE] {self.name} circuit {state}{f' — {reason}' if reason else ''}")
+            _announce(self.name, state, reason)
+
+    def allow(self) -> bool:
+        """May a call go through? In half-open, only one probe at a time."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset:
+                self._set(self.HALF_OPEN)
+            if self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self.probing):
+                self.probing = self.state == self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset - time.monotonic())
+
+    def success(self):
+        with self._lock:
+            self.failures, self.probing = 0, False
+            self._set(self.CLOSED)
+
+    def failure(self, reason: str):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.opened_at, self.probing = time.monotonic(), False
+                self._set(self.OPEN, reason)
+
+    def abandon(self):
+        """A permitted call never reached the upstream; free the probe slot."""
+        with self._lock:
+            self.probing = False
+
+
+# ── registry ─────────────────────────────────────────────────────────────────
+
+RATE_LIMITS = {u: TokenBucket(_env("SCOUT_RATE", u, 0), _env("SCOUT_BURST", u, 0)) for u in UPSTREAMS}
+BREAKERS    = {u: Breaker(u) for u in UPSTREAMS}
+SLOW_CALL   = {u: _env("SCOUT_BREAKER_SLOW", u, SLOW_DEFAULTS[u]) for u in UPSTREAMS}
+INFLIGHT    = {u: int(_env("SCOUT_INFLIGHT", u, INFLIGHT_DEFAULTS[u])) for u in UPSTREAMS}
+_slots      = {u: threading.BoundedSemaphore(n) for u, n in INFLIGHT.items() if n > 0}
+
+
+def throttle(upstream: str):
+    """Wait for `upstream`'s rate limit; time spent waiting is recorded as a span."""
+    bucket = RATE_LIMITS[upstream]
+    if bucket.rate <= 0:
+        return
+    with span("ratelimit", upstream):
+        bucket.acquire()
+
+
+def _rate_limited(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "rate limit" in text
+
+
+def guard(upstream: str, fn, *args, **kwargs):
+    """Call fn under `upstream`'s concurrency cap, breaker and rate limit.
+
+    Raises Unavailable without calling fn when the breaker is open or no slot
+    frees up within SCOUT_INFLIGHT_WAIT; otherwise returns or raises what fn does.
+    """
+    breaker, bucket, slots = BREAKERS[upstream], RATE_LIMITS[upstream], _slots.get(upstream)
+    if not breaker.allow():
+        _announce(upstream, breaker.state, f"failing fast, retry in {breaker.retry_in():.0f}s")
+        raise Unavailable(upstream, "circuit open")
+    if slots and not slots.acquire(timeout=INFLIGHT_WAIT):
+        breaker.abandon()
+        raise Unavailable(upstream, f"{INFLIGHT[upstream]} calls already in flight")
+    try:
+        throttle(upstream)
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if _rate_limited(e):
+                bucket.throttled()
+            breaker.failure(str(e)[:120])
+            raise
+        elapsed = time.monotonic() - started
+        if SLOW_CALL[upstream] and elapsed > SLOW_CALL[upstream]:
+            breaker.failure(f"slow call ({elapsed:.1f}s)")
+        else:
+            breaker.success()
+            bucket.succeeded()
+        return result
+    finally:
+        if slots:
+            slots.release()
+
+
+def states() -> dict:
+    """upstream → breaker state, for anything not currently closed."""
+    return {u: b.state for u, b in BREAKERS.items() if b.state != Breaker.CLOSED}
+
+
+def breaker_metrics() -> list:
+    codes = {Breaker.CLOSED: 0, Breaker.HALF_OPEN: 1, Breaker.OPEN: 2}
+    lines = ["# TYPE scout_breaker_state gauge", "# TYPE scout_breaker_rejections_total counter",
+             "# TYPE scout_rate_limit_rps gauge"]
+    for upstream, breaker in BREAKERS.items():
+        lines.append(f'scout_breaker_state{{upstream="{upstream}"}} {codes[breaker.state]}')
+        lines.append(f'scout_breaker_rejections_total{{upstream="{upstream}"}} {breaker.rejected}')
+        if RATE_LIMITS[upstream].ceiling > 0:
+            lines.append(f'scout_rate_limit_rps{{upstream="{upstream}"}} {RATE_LIMITS[upstream].rate:g}')
+    return lines
+
+metrics.COLLECTORS.append(breaker_metrics)
@@ -0,0 +1,95 @@
+"""
+storage.py — Local on-disk state shared by Scout's caches, queues and stores.
+
+Everything lives under SCOUT_STATE_DIR (default .scout/). SQLite databases run
+in WAL mode with a busy timeout so several gunicorn workers can share them.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+
+STATE_DIR = os.getenv("SCOUT_STATE_DIR", ".scout")
+
+_local = threading.local()
+
+# The process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def state_path(filename: str) -> str:
+    """Path to a file inside the state directory, creating the directory."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    return os.path.join(STATE_DIR, filename)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Per-thread SQLite connection to `path`, configured for multi-process use."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=10000")
+        conns[path] = conn
+    return conn
+
+
+class AtomicFile:
+    """A file written incrementally that only appears at `path` on commit().
+
+    Writes go to a temp file next to `path`; commit() fsyncs it and renames
+    it into place, discard() throws it away. Readers never see a partial file.
+    The file gets the mode `path` already has, else the umask default (not
+    mkstemp's 0600).
+    """
+
+    def __init__(self, path: str, mode: str = "w"):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+        try:
+            perms = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            perms = 0o666 & ~_UMASK
+        os.fchmod(fd, perms)
+        self.path = path
+        self.file = os.fdopen(fd, mode)
+
+    def write(self, data):
+        self.file.write(data)
+
+    def truncate(self):
+        self.file.seek(0)
+        self.file.truncate()
+
+    def commit(self):
+        try:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            os.replace(self.tmp, self.path)
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp):
+            os.unlink(self.tmp)
+
+
+def atomic_write(path: str, data, mode: str = "w"):
+    """Write `data` to a temp file next to `path`, then rename it into place."""
+    f = AtomicFile(path, mode)
+    try:
+        f.write(data)
+    except BaseException:
+        f.discard()
+        raise
+    f.commit()
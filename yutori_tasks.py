@@ -0,0 +1,202 @@
+"""
+yutori_tasks.py — Background manager for long-running Yutori Research tasks.
+
+Yutori tasks take 5-10 minutes. Instead of a request thread sleeping in a poll
+loop per task, tasks are submitted here and a single scheduler thread polls
+every in-flight task with per-task exponential backoff. Task state lives in
+SQLite under .scout/, so a restarted worker picks up where it left off, and
+a lease column keeps two gunicorn workers from polling the same task.
+
+Completion is push-style: per-task callbacks plus global hooks (Scout uses
+one to drop finished research into prebaked/) fire when a task finishes.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import http
+from storage import connect, state_path
+
+YUTORI_API = "https://api.yutori.com/v1/research/tasks"
+
+POLL_MIN     = float(os.getenv("YUTORI_POLL_MIN", 10))
+POLL_MAX     = float(os.getenv("YUTORI_POLL_MAX", 60))
+POLL_BACKOFF = float(os.getenv("YUTORI_POLL_BACKOFF", 1.5))
+TASK_TIMEOUT = float(os.getenv("YUTORI_TASK_TIMEOUT", 30 * 60))
+POLL_WORKERS = int(os.getenv("YUTORI_POLL_WORKERS", 8))
+LEASE        = 2 * POLL_MAX
+
+DONE_STATUSES   = ("completed", "succeeded")
+FAILED_STATUSES = ("failed", "error")
+
+
+def yutori_headers() -> dict:
+    return {"X-API-KEY": os.getenv("YUTORI_API_KEY"), "Content-Type": "application/json"}
+
+
+class YutoriTaskManager:
+    def __init__(self, path: str = None):
+        self.path       = path or state_path("yutori_tasks.db")
+        self.owner      = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.hooks      = []     # fn(task: dict) for every finished task
+        self._callbacks = {}     # task_id → [fn(task: dict)]
+        self._wake      = threading.Condition()
+        self._thread    = None
+        self._pollers   = ThreadPoolExecutor(max_workers=POLL_WORKERS, thread_name_prefix="yutori-poll")
+        self._db().execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY, company TEXT, query TEXT, status TEXT,"
+            " submitted REAL, next_poll REAL, interval REAL,"
+            " owner TEXT, lease_until REAL, result TEXT)"
+        )
+
+    def _db(self):
+        return connect(self.path)
+
+    # ── submission ───────────────────────────────────────────────────────────
+
+    def submit(self, query: str, company: str = None, on_complete=None) -> str:
+        """Start a Yutori task and hand it to the scheduler. Returns the task id."""
+        r = http.post(YUTORI_API, headers=yutori_headers(), json={"query": query})
+        r.raise_for_status()
+        task_id = r.json()["task_id"]
+        now = time.time()
+        self._db().execute(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, 'running', ?, ?, ?, ?, ?, NULL)",
+            (task_id, company, query, now, now + POLL_MIN, POLL_MIN, self.owner, now + LEASE)
+        )
+        if on_complete:
+            self.on_complete(task_id, on_complete)
+        self.start()
+        return task_id
+
+    def on_complete(self, task_id: str, callback):
+        """Call `callback(task)` once `task_id` finishes (immediately if it already has)."""
+        # Check and register under the lock _finish pops callbacks under, so a
+        # task finishing in between can't miss this callback
+        with self._wake:
+            task = self.get(task_id)
+            if not task or task["status"] == "running":
+                self._callbacks.setdefault(task_id, []).append(callback)
+                return
+        callback(task)
+
+    def get(self, task_id: str):
+        row = self._db().execute(
+            "SELECT task_id, company, query, status, submitted, result FROM tasks WHERE task_id = ?",
+            (task_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return {"task_id": row[0], "company": row[1], "query": row[2], "status": row[3],
+                "submitted": row[4], "result": json.loads(row[5]) if row[5] else None}
+
+    def adopt(self, company: str):
+        """Claim an unfinished task already submitted for `company`; returns its id, if any.
+
+        Only a task this manager owns, or whose owner's lease has lapsed, is
+        adopted. One a live process is still polling would never complete here.
+        """
+        db, now = self._db(), time.time()
+        rows = db.execute(
+            "SELECT task_id FROM tasks WHERE status = 'running' AND company = ?"
+            " AND (owner = ? OR lease_until < ?) ORDER BY submitted DESC",
+            (company, self.owner, now)
+        ).fetchall()
+        for (task_id,) in rows:
+            cur = db.execute(
+                "UPDATE tasks SET owner = ?, lease_until = ? WHERE task_id = ?"
+                " AND (owner = ? OR lease_until < ?)",
+                (self.owner, now + LEASE, task_id, self.owner, now)
+            )
+            if cur.rowcount:
+                return task_id
+        return None
+
+    def pending(self) -> list:
+        rows = self._db().execute("SELECT task_id FROM tasks WHERE status = 'running'").fetchall()
+        return [r[0] for r in rows]
+
+    # ── scheduler ────────────────────────────────────────────────────────────
+
+    def start(self):
+        """Start the scheduler thread if it isn't running (also resumes persisted tasks)."""
+        with self._wake:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="yutori-scheduler", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+
+    def _claim_due(self, now: float) -> list:
+        db = self._db()
+        rows = db.execute(
+            "SELECT task_id, submitted, interval FROM tasks WHERE status = 'running'"
+            " AND next_poll <= ? AND (owner = ? OR lease_until < ?)",
+            (now, self.owner, now)
+        ).fetchall()
+        claimed = []
+        for task_id, submitted, interval in rows:
+            cur = db.execute(
+                "UPDATE tasks SET owner = ?, lease_until = ? WHERE task_id = ?"
+                " AND (owner = ? OR lease_until < ?)",
+                (self.owner, now + LEASE, task_id, self.owner, now)
+            )
+            if cur.rowcount:
+                claimed.append((task_id, submitted, interval))
+        return claimed
+
+    def _next_wakeup(self) -> float:
+        row = self._db().execute(
+            "SELECT MIN(next_poll) FROM tasks WHERE status = 'running'"
+        ).fetchone()
+        return row[0] if row and row[0] else None
+
+    def _run(self):
+        while True:
+            # Due tasks are polled in parallel; the scheduler itself stays single
+            list(self._pollers.map(lambda task: self._poll(*task), self._claim_due(time.time())))
+            next_poll = self._next_wakeup()
+            delay = POLL_MAX if next_poll is None else next_poll - time.time()
+            with self._wake:
+                self._wake.wait(timeout=min(max(delay, 0.5), POLL_MAX))
+
+    def _poll(self, task_id: str, submitted: float, interval: float):
+        try:
+            r = http.get(f"{YUTORI_API}/{task_id}", headers=yutori_headers())
+            r.raise_for_status()
+            data   = r.json()
+            status = data.get("status", "unknown")
+        except Exception as e:
+            print(f"[YUTORI] Poll error for {task_id}: {e}")
+            data, status = None, "unknown"
+
+        if status in DONE_STATUSES:
+            self._finish(task_id, "completed", data)
+        elif status in FAILED_STATUSES:
+            self._finish(task_id, "failed", data)
+        elif time.time() - submitted > TASK_TIMEOUT:
+            self._finish(task_id, "timed_out", data)
+        else:
+            interval = min(interval * POLL_BACKOFF, POLL_MAX)
+            self._db().execute(
+                "UPDATE tasks SET next_poll = ?, interval = ? WHERE task_id = ?",
+                (time.time() + interval, interval, task_id)
+            )
+
+    def _finish(self, task_id: str, status: str, data):
+        self._db().execute(
+            "UPDATE tasks SET status = ?, result = ?, owner = NULL WHERE task_id = ?",
+            (status, json.dumps(data) if data is not None else None, task_id)
+        )
+        task = self.get(task_id)
+        print(f"[YUTORI] Task {task_id} ({task['company'] or task['query'][:40]}) → {status}")
+        with self._wake:
+            callbacks = self._callbacks.pop(task_id, [])
+        for fn in self.hooks + callbacks:
+            try:
+                fn(task)
+            except Exception as e:
+                print(f"[YUTORI] Completion callback failed for {task_id}: {e}")